@@ -32,7 +32,30 @@ def create_app():
     app.register_blueprint(bookings_bp)
     app.register_blueprint(clients_bp)
     app.register_blueprint(reports_bp)
-     
+
+    # N+1 detector (lazy loads për request)
+    from .utils.nplusone import init_nplusone
+    init_nplusone(app)
+
+    # ActivityLog: një INSERT për commit, ose writer në background (AUDIT_ASYNC)
+    from .utils.audit import init_audit
+    init_audit(app)
+
+    # Cache-t e time-series: versioni rritet me commit-in që prek ditë të kaluara
+    from .utils.cache import init_cache
+    init_cache(app)
+
+    # Preview-t e dokumenteve: paralajmërim nëse mungon Pillow
+    from .utils.previews import init_previews
+    init_previews(app)
+
+    # Jinja: {{ amount|money }} -> "1,234.50"
+    from .utils.money import format_money
+    app.add_template_filter(format_money, "money")
+
+    # CLI commands (flask <command>)
+    from .commands import register_commands
+    register_commands(app)
 
     # Root → login
     @app.route("/")
@@ -3,8 +3,9 @@ from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import check_password_hash
 
 from .forms import LoginForm, AgentCreateForm, AgentEditForm
-from ..models import User, ActivityLog
+from ..models import User
 from ..extensions import db
+from ..utils.audit import log_action
 from . import auth_bp
 
 
@@ -85,15 +86,7 @@ def users_create():
         db.session.add(user)
         db.session.flush()
 
-        db.session.add(
-            ActivityLog(
-                user_id=current_user.id,
-                action="Created user",
-                entity_type="User",
-                entity_id=user.id,
-                meta={"email": user.email, "role": user.role},
-            )
-        )
+        log_action("Created user", "User", user.id, {"email": user.email, "role": user.role})
 
         db.session.commit()
         flash("User created successfully.", "success")
@@ -126,15 +119,7 @@ def users_edit(user_id):
         if form.password.data:
             user.set_password(form.password.data)
 
-        db.session.add(
-            ActivityLog(
-                user_id=current_user.id,
-                action="Updated user",
-                entity_type="User",
-                entity_id=user.id,
-                meta={"email": user.email, "role": user.role},
-            )
-        )
+        log_action("Updated user", "User", user.id, {"email": user.email, "role": user.role})
 
         db.session.commit()
         flash("User updated successfully.", "success")
@@ -7,7 +7,7 @@ from wtforms import (
     StringField,
     DateField,
     IntegerField,
-    FloatField,
+    DecimalField,
     SelectField,
     TextAreaField,
     SubmitField,
@@ -15,6 +15,8 @@ from wtforms import (
 )
 from wtforms.validators import DataRequired, Email, Length, NumberRange, Optional
 
+from ..utils.money import CENT, ZERO
+
 
 STATUS_CHOICES = [
     ("new", "new"),
@@ -123,33 +125,33 @@ class BookingCreateForm(FlaskForm):
         validators=[DataRequired()],
     )
 
-    total_price = FloatField("Total price", validators=[DataRequired(), NumberRange(min=0)], default=0)
+    total_price = DecimalField("Total price", validators=[DataRequired(), NumberRange(min=ZERO)], default=0)
 
     # Money fields: bosh -> 0
-    discount = FloatField(
+    discount = DecimalField(
         "Discount",
-        validators=[Optional(), NumberRange(min=0)],
+        validators=[Optional(), NumberRange(min=ZERO)],
         default=0,
         filters=[empty_to_zero],
     )
 
-    service_fee = FloatField(
+    service_fee = DecimalField(
         "Service fee",
-        validators=[Optional(), NumberRange(min=0)],
+        validators=[Optional(), NumberRange(min=ZERO)],
         default=0,
         filters=[empty_to_zero],
     )
 
-    extras_total = FloatField(
+    extras_total = DecimalField(
         "Extras total",
-        validators=[Optional(), NumberRange(min=0)],
+        validators=[Optional(), NumberRange(min=ZERO)],
         default=0,
         filters=[empty_to_zero],
     )
 
-    internal_cost = FloatField(
+    internal_cost = DecimalField(
         "Internal cost",
-        validators=[Optional(), NumberRange(min=0)],
+        validators=[Optional(), NumberRange(min=ZERO)],
         default=0,
         filters=[empty_to_zero],
     )
@@ -185,9 +187,11 @@ DOC_TYPES = [
     ("other", "other"),
 ]
 
+DOC_EXTENSIONS = ["pdf", "jpg", "jpeg", "png", "webp"]
+
 
 class PaymentCreateForm(FlaskForm):
-    amount = FloatField("Amount", validators=[DataRequired(), NumberRange(min=0.01)])
+    amount = DecimalField("Amount", validators=[DataRequired(), NumberRange(min=CENT)])
     method = SelectField("Method", choices=PAYMENT_METHODS, default="cash", validators=[DataRequired()])
     currency = SelectField("Currency", choices=CURRENCY_CHOICES, default="EUR", validators=[DataRequired()])
     note = StringField("Note", validators=[Optional(), Length(max=255)])
@@ -201,12 +205,24 @@ class DocumentUploadForm(FlaskForm):
         "File",
         validators=[
             DataRequired(),
-            FileAllowed(["pdf", "jpg", "jpeg", "png", "webp"], "Allowed: pdf, jpg, png, webp"),
+            FileAllowed(DOC_EXTENSIONS, "Allowed: pdf, jpg, png, webp"),
         ],
     )
     submit = SubmitField("Upload")
 
 
+class BookingImportForm(FlaskForm):
+    agent_id = SelectField("Assign to agent", coerce=int, validators=[DataRequired()])
+    file = FileField(
+        "File",
+        validators=[
+            DataRequired(),
+            FileAllowed(["csv", "xlsx"], "Allowed: csv, xlsx"),
+        ],
+    )
+    submit = SubmitField("Import")
+
+
 class BookingFilterForm(FlaskForm):
     q = StringField("Search", validators=[Optional(), Length(max=120)])  # reference/client/email/phone
     destination = StringField("Destination", validators=[Optional(), Length(max=120)])
@@ -1,15 +1,31 @@
-import os
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from wtforms.validators import ValidationError
 
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app, abort, request
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app, abort, request, jsonify, send_file
 from flask_login import login_required, current_user
-from sqlalchemy import or_
+from flask_wtf.csrf import validate_csrf
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager
 
+from ..decorators import admin_required
 from ..extensions import db
-from ..models import Client, Booking, Payment, Document, ActivityLog, User
-from ..utils.reference import next_booking_reference, next_receipt_no
-from .forms import BookingCreateForm, PaymentCreateForm, DocumentUploadForm, BookingFilterForm
+from ..models import Client, Booking, Payment, Document, User, UploadSession
+from ..utils import previews
+from ..utils.audit import booking_timeline, log_action
+from ..utils.cache import count_cache, invalidate_dashboard
+from ..utils.export import export_response
+from ..utils.fx import convert
+from ..utils.importer import IMPORT_COLUMNS, import_bookings, read_rows
+from ..utils.money import minor_units
+from ..utils.pagination import decode_cursor, get_per_page, keyset_paginate
+from ..utils.reference import next_booking_reference, next_invoice_no, next_receipt_no
+from ..utils.rollups import booking_snapshot, record_booking, record_booking_update, record_payment
+from ..utils.search import booking_search_filter, index_booking, index_client
+from ..utils.storage import preview_path, send_document, store_stream
+from ..utils.uploads import OffsetMismatch, cancel_upload, finalize_upload, start_upload, write_chunk
+from ..utils.zipstream import document_entries, zip_response
+from .forms import BookingCreateForm, PaymentCreateForm, DocumentUploadForm, BookingFilterForm, BookingImportForm
 
 
 bookings_bp = Blueprint("bookings", __name__, url_prefix="/bookings")
@@ -17,18 +33,6 @@ bookings_bp = Blueprint("bookings", __name__, url_prefix="/bookings")
 REQUIRED_DOCS_DEFAULT = ["passport", "ticket"]  # mund ta ndryshojmë më vonë
 
 
-def log_action(action, entity_type, entity_id=None, meta=None):
-    db.session.add(
-        ActivityLog(
-            user_id=current_user.id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            meta=meta or {},
-        )
-    )
-
-
 def get_booking_or_404(booking_id: int) -> Booking:
     b = Booking.query.get_or_404(booking_id)
     if current_user.role != "admin" and b.agent_id != current_user.id:
@@ -36,6 +40,17 @@ def get_booking_or_404(booking_id: int) -> Booking:
     return b
 
 
+INVOICED_STATUSES = ("confirmed", "completed")
+
+
+def issue_invoice(b: Booking):
+    # Numri i faturës jepet një herë, kur booking-u konfirmohet (nuk ndryshon më pas)
+    if b.status in INVOICED_STATUSES and not b.invoice_no:
+        b.invoice_no = next_invoice_no()
+        return True
+    return False
+
+
 @bookings_bp.route("/new", methods=["GET", "POST"])
 @login_required
 def create():
@@ -51,7 +66,7 @@ def create():
         client = Client.query.filter(
             Client.email == email,
             Client.phone == phone,
-            Client.is_archived.is_(False),
+            Client.is_archived == False,  # noqa: E712
         ).first()
 
         if client:
@@ -64,6 +79,7 @@ def create():
             client.nationality = form.nationality.data.strip() if form.nationality.data else None
             client.address = form.address.data.strip() if form.address.data else None
             client.notes = form.client_notes.data.strip() if form.client_notes.data else None
+            index_client(client)
 
             log_action(
                 "Client updated via booking",
@@ -89,6 +105,7 @@ def create():
             )
             db.session.add(client)
             db.session.flush()
+            index_client(client)
 
             log_action(
                 "Client created via booking",
@@ -121,10 +138,20 @@ def create():
             internal_cost=form.internal_cost.data or 0,
             status=form.status.data,
         )
+        booking.refresh_due()
+        issue_invoice(booking)
         db.session.add(booking)
         db.session.flush()
-
-        log_action("Created booking", "Booking", booking.id, {"reference": booking.reference, "status": booking.status})
+        record_booking(booking)
+        index_booking(booking)
+
+        log_action(
+            "Created booking",
+            "Booking",
+            booking.id,
+            {"reference": booking.reference, "status": booking.status, "invoice_no": booking.invoice_no},
+            client_id=booking.client_id,
+        )
 
         try:
             db.session.commit()
@@ -134,6 +161,8 @@ def create():
             flash("Database error while saving booking.", "danger")
             return render_template("bookings/new.html", form=form)
 
+        invalidate_dashboard(assigned_agent_id, client.agent_id)
+        count_cache.clear()
         flash(f"Booking created: {booking.reference}", "success")
         return redirect(url_for("bookings.detail", booking_id=booking.id))
 
@@ -145,6 +174,47 @@ def create():
 
 
 
+@bookings_bp.route("/import", methods=["GET", "POST"])
+@login_required
+@admin_required
+def import_file():
+    """
+    Vetëm admin: import masiv CSV / XLSX (shih utils/importer.py).
+    Skedari lexohet si stream; çdo batch bëhet commit më vete.
+    """
+    form = BookingImportForm()
+    agents = User.query.filter_by(is_active=True).order_by(User.full_name.asc()).all()
+    form.agent_id.choices = [(a.id, f"{a.full_name} ({a.role})") for a in agents]
+    if request.method == "GET":
+        form.agent_id.data = current_user.id
+
+    result = None
+    if form.validate_on_submit():
+        f = form.file.data
+        filename = secure_filename(f.filename or "")
+        try:
+            result = import_bookings(
+                read_rows(f.stream, filename),
+                agent_id=form.agent_id.data,
+                user_id=current_user.id,
+                source=filename,
+            )
+        except ValueError as e:
+            flash(str(e), "danger")
+        except Exception as e:
+            db.session.rollback()
+            print("IMPORT ERROR:", repr(e))
+            flash("Database error during import; batches before the error were saved.", "danger")
+        else:
+            flash(f"Imported {result.bookings} bookings ({result.skipped} rows skipped).", "success")
+
+    return render_template("bookings/import.html", form=form, result=result, columns=IMPORT_COLUMNS)
+
+
+def booking_documents(booking_id):
+    return Document.query.filter_by(booking_id=booking_id, is_archived=False).order_by(Document.created_at.desc())
+
+
 @bookings_bp.route("/<int:booking_id>")
 @login_required
 def detail(booking_id):
@@ -156,11 +226,7 @@ def detail(booking_id):
         .order_by(Payment.paid_at.desc())
         .all()
     )
-    docs = (
-        Document.query.filter_by(booking_id=b.id, is_archived=False)
-        .order_by(Document.created_at.desc())
-        .all()
-    )
+    docs = booking_documents(b.id).all()
 
     uploaded_types = {d.doc_type for d in docs}
     required_docs = REQUIRED_DOCS_DEFAULT[:]
@@ -169,10 +235,12 @@ def detail(booking_id):
     payment_form = PaymentCreateForm()
     doc_form = DocumentUploadForm()
 
-    logs_q = ActivityLog.query
-    if current_user.role != "admin":
-        logs_q = logs_q.filter(ActivityLog.user_id == current_user.id)
-    recent_logs = logs_q.order_by(ActivityLog.created_at.desc()).limit(10).all()
+    timeline = booking_timeline(b.id)
+
+    # Ekuivalenti në monedhën bazë (kursi i ditës së krijimit, cache në proces)
+    base_total = None
+    if b.currency and b.currency != current_app.config.get("BASE_CURRENCY", "EUR"):
+        base_total = convert(b.total_price, b.currency, b.created_at.date())
 
     return render_template(
         "bookings/detail.html",
@@ -183,7 +251,8 @@ def detail(booking_id):
         missing_docs=missing_docs,
         payment_form=payment_form,
         doc_form=doc_form,
-        recent_logs=recent_logs,
+        timeline=timeline,
+        base_total=base_total,
     )
 
 
@@ -208,6 +277,8 @@ def edit(booking_id):
         form.client_notes.data = client.notes
 
     if form.validate_on_submit():
+        stats_before = booking_snapshot(b)
+
         # update client
         client.first_name = form.first_name.data.strip()
         client.last_name = form.last_name.data.strip()
@@ -239,9 +310,16 @@ def edit(booking_id):
         b.extras_total = form.extras_total.data or 0
         b.internal_cost = form.internal_cost.data or 0
         b.status = form.status.data
-
-        log_action("Updated booking", "Booking", b.id, {"reference": b.reference})
+        b.refresh_due()
+        record_booking_update(stats_before, b)
+        index_client(client)
+
+        meta = {"reference": b.reference}
+        if issue_invoice(b):
+            meta["invoice_no"] = b.invoice_no
+        log_action("Updated booking", "Booking", b.id, meta, client_id=b.client_id)
         db.session.commit()
+        invalidate_dashboard(b.agent_id, client.agent_id)
 
         flash("Booking updated successfully.", "success")
         return redirect(url_for("bookings.detail", booking_id=b.id))
@@ -275,16 +353,33 @@ def add_payment(booking_id):
         paid_at=datetime.utcnow(),
     )
     db.session.add(p)
+    b.apply_payment(p.amount)
     db.session.flush()
+    record_payment(p)
 
-    log_action("Payment added", "Payment", p.id, {"booking_id": b.id, "amount": p.amount, "currency": p.currency})
+    log_action(
+        "Payment added",
+        "Payment",
+        p.id,
+        {"booking_id": b.id, "amount": float(p.amount), "currency": p.currency},
+        booking_id=b.id,
+        client_id=b.client_id,
+    )
 
-    # Auto status update (simple rule)
-    if b.due_amount() - p.amount <= 0 and b.status in ("new", "in_progress", "pending_payment"):
+    # Auto status update (simple rule) - due_total është rifreskuar nga flush
+    if b.due_amount() <= 0 and b.status in ("new", "in_progress", "pending_payment"):
         b.status = "confirmed"
-        log_action("Booking status updated", "Booking", b.id, {"status": b.status})
+        issue_invoice(b)
+        log_action(
+            "Booking status updated",
+            "Booking",
+            b.id,
+            {"status": b.status, "invoice_no": b.invoice_no},
+            client_id=b.client_id,
+        )
 
     db.session.commit()
+    invalidate_dashboard(b.agent_id)
     flash("Payment added successfully.", "success")
     return redirect(url_for("bookings.detail", booking_id=b.id))
 
@@ -305,71 +400,180 @@ def upload_doc(booking_id):
         flash("Invalid filename.", "danger")
         return redirect(url_for("bookings.detail", booking_id=b.id))
 
-    root = current_app.config.get("UPLOAD_FOLDER", "uploads")
-    folder = os.path.join(root, "bookings", str(b.id))
-    os.makedirs(folder, exist_ok=True)
+    # stream -> temp + sha256 -> blob i ndarë (i njëjti skedar ruhet një herë)
+    blob = store_stream(f.stream)
+    doc = add_document(b, form.doc_type.data, bool(form.is_required.data), filename, blob)
+
+    db.session.commit()
+    previews.enqueue([doc.id])
+    flash("Document uploaded.", "success")
+    return redirect(url_for("bookings.detail", booking_id=b.id))
 
-    ext = os.path.splitext(filename)[1].lower()
-    safe_name = f"{form.doc_type.data}_{int(datetime.utcnow().timestamp())}{ext}"
-    save_path = os.path.join(folder, safe_name)
-    f.save(save_path)
 
+def add_document(b, doc_type, is_required, filename, blob):
     doc = Document(
         client_id=b.client_id,
         booking_id=b.id,
-        doc_type=form.doc_type.data,
-        file_path=save_path.replace("\\", "/"),
+        doc_type=doc_type,
+        file_path=blob.key,
         original_name=filename,
-        is_required=bool(form.is_required.data),
+        sha256=blob.sha256,
+        size_bytes=blob.size_bytes,
+        preview_status=previews.PENDING if previews.wants_preview(filename) else None,
+        is_required=is_required,
         uploaded_by=current_user.id,
     )
     db.session.add(doc)
     db.session.flush()
 
-    log_action("Document uploaded", "Document", doc.id, {"booking_id": b.id, "type": doc.doc_type})
+    log_action(
+        "Document uploaded",
+        "Document",
+        doc.id,
+        {"booking_id": b.id, "type": doc.doc_type},
+        booking_id=b.id,
+        client_id=b.client_id,
+    )
+    return doc
 
-    db.session.commit()
-    flash("Document uploaded.", "success")
-    return redirect(url_for("bookings.detail", booking_id=b.id))
+
+# -------------------------
+# Upload me copa (JSON), shih utils/uploads.py
+# -------------------------
+def check_csrf():
+    # endpoint-et JSON: token-i i formës (DocumentUploadForm) vjen në header
+    if current_app.config.get("WTF_CSRF_ENABLED", True):
+        try:
+            validate_csrf(request.headers.get("X-CSRFToken"))
+        except ValidationError as e:
+            abort(400, str(e))
 
 
-@bookings_bp.route("", methods=["GET"])
+def get_upload_or_404(b, upload_id) -> UploadSession:
+    return UploadSession.query.filter_by(id=upload_id, booking_id=b.id, user_id=current_user.id).first_or_404()
+
+
+def upload_state(b, upload):
+    return {
+        "upload_id": upload.id,
+        "offset": upload.received,
+        "size": upload.total_size,
+        "chunk_size": current_app.config.get("UPLOAD_CHUNK_SIZE"),
+        "url": url_for("bookings.upload_chunk", booking_id=b.id, upload_id=upload.id),
+    }
+
+
+@bookings_bp.route("/<int:booking_id>/docs/uploads", methods=["POST"])
 @login_required
-def list_bookings():
-    form = BookingFilterForm(request.args)
+def upload_init(booking_id):
+    """
+    JSON: {doc_type, filename, size, sha256?, is_required?} -> 201 me upload_id dhe offset 0.
+    """
+    b = get_booking_or_404(booking_id)
+    check_csrf()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        upload = start_upload(
+            b,
+            current_user.id,
+            doc_type=data.get("doc_type"),
+            filename=data.get("filename"),
+            size=data.get("size"),
+            sha256=data.get("sha256"),
+            is_required=data.get("is_required"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Base query + join me Client (për kërkim)
-    q = (
-        Booking.query.join(Client, Booking.client_id == Client.id)
-        .filter(or_(Booking.is_archived.is_(False), Booking.is_archived.is_(None)))
-    )
+    db.session.commit()
+    return jsonify(upload_state(b, upload)), 201
 
-    # Scope: admin all, agent own only
-    if current_user.role != "admin":
-        q = q.filter(Booking.agent_id == current_user.id)
 
-    # Populate agent dropdown (admin only)
-    if current_user.role == "admin":
-        agents = User.query.filter_by(role="agent", is_active=True).order_by(User.full_name.asc()).all()
-        form.agent_id.choices = [("", "all")] + [(str(a.id), a.full_name) for a in agents]
+@bookings_bp.route("/<int:booking_id>/docs/uploads/<upload_id>", methods=["GET"])
+@login_required
+def upload_status(booking_id, upload_id):
+    """Për rifillim: sa bajte janë ruajtur."""
+    b = get_booking_or_404(booking_id)
+    return jsonify(upload_state(b, get_upload_or_404(b, upload_id)))
 
-        if form.agent_id.data:
-            q = q.filter(Booking.agent_id == int(form.agent_id.data))
-    else:
-        form.agent_id.choices = [("", "all")]
 
-    # Text search
-    if form.q.data:
-        term = f"%{form.q.data.strip()}%"
-        q = q.filter(
-            or_(
-                Booking.reference.ilike(term),
-                Client.first_name.ilike(term),
-                Client.last_name.ilike(term),
-                Client.email.ilike(term),
-                Client.phone.ilike(term),
-            )
+@bookings_bp.route("/<int:booking_id>/docs/uploads/<upload_id>", methods=["PUT"])
+@login_required
+def upload_chunk(booking_id, upload_id):
+    """
+    Body = bajtet e copës, ?offset=N (duhet = offset i ruajtur), header opsional X-Chunk-Sha256.
+    409 me offset-in e saktë nëse nuk përputhet.
+    """
+    b = get_booking_or_404(booking_id)
+    check_csrf()
+    upload = get_upload_or_404(b, upload_id)
+
+    try:
+        write_chunk(
+            upload,
+            request.args.get("offset", -1, type=int),
+            request.stream,
+            chunk_sha256=request.headers.get("X-Chunk-Sha256"),
         )
+    except OffsetMismatch as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "offset": e.offset}), 409
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e), "offset": upload.received}), 422
+
+    db.session.commit()
+    return jsonify(upload_state(b, upload))
+
+
+@bookings_bp.route("/<int:booking_id>/docs/uploads/<upload_id>/finalize", methods=["POST"])
+@login_required
+def upload_finalize(booking_id, upload_id):
+    b = get_booking_or_404(booking_id)
+    check_csrf()
+    upload = get_upload_or_404(b, upload_id)
+
+    try:
+        blob = finalize_upload(upload)
+    except ValueError as e:
+        db.session.commit()  # finalize mund të ketë anuluar sesionin (checksum)
+        return jsonify({"error": str(e)}), 422
+
+    doc = add_document(b, upload.doc_type, upload.is_required, upload.original_name, blob)
+    db.session.commit()
+    previews.enqueue([doc.id])
+    return jsonify({
+        "document_id": doc.id,
+        "sha256": blob.sha256,
+        "url": url_for("bookings.download_doc", booking_id=b.id, doc_id=doc.id),
+    }), 201
+
+
+@bookings_bp.route("/<int:booking_id>/docs/uploads/<upload_id>", methods=["DELETE"])
+@login_required
+def upload_cancel(booking_id, upload_id):
+    b = get_booking_or_404(booking_id)
+    check_csrf()
+    cancel_upload(get_upload_or_404(b, upload_id))
+    db.session.commit()
+    return "", 204
+
+
+def apply_booking_filters(q, form):
+    """
+    Scope + filtrat e BookingFilterForm (lista dhe export).
+    q duhet të ketë join me Client (kërkimi mund të kalojë te kolonat e klientit).
+    """
+    # Scope: admin all (ose një agjent), agent own only
+    if current_user.role != "admin":
+        q = q.filter(Booking.agent_id == current_user.id)
+    elif form.agent_id.data:
+        q = q.filter(Booking.agent_id == int(form.agent_id.data))
+
+    # Text search (indeks FTS / trigram, shih utils/search.py)
+    if form.q.data and form.q.data.strip():
+        q = q.filter(booking_search_filter(form.q.data.strip()))
 
     if form.destination.data:
         term = f"%{form.destination.data.strip()}%"
@@ -383,26 +587,160 @@ def list_bookings():
     if form.date_to.data:
         q = q.filter(Booking.travel_date <= form.date_to.data)
 
-    # Pagination
-    page = request.args.get("page", 1, type=int)
-    per_page = 15
-    pagination = q.order_by(Booking.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    return q
+
+
+@bookings_bp.route("/<int:booking_id>/docs/<int:doc_id>", methods=["GET"])
+@login_required
+def download_doc(booking_id, doc_id):
+    """
+    Shkarkim / shfaqje e dokumentit, me scope si booking-u (get_booking_or_404).
+    ?download=1 -> attachment, përndryshe inline.
+    """
+    b = get_booking_or_404(booking_id)
+    doc = Document.query.filter_by(id=doc_id, booking_id=b.id).first_or_404()
+    return send_document(doc, as_attachment=request.args.get("download") == "1")
+
+
+@bookings_bp.route("/<int:booking_id>/docs/<int:doc_id>/preview", methods=["GET"])
+@login_required
+def doc_preview(booking_id, doc_id):
+    """Thumbnail JPEG (404 derisa preview_status = ready)."""
+    b = get_booking_or_404(booking_id)
+    doc = Document.query.filter_by(id=doc_id, booking_id=b.id).first_or_404()
+    if doc.preview_status != previews.READY:
+        abort(404)
+
+    resp = send_file(preview_path(doc.sha256), mimetype="image/jpeg", conditional=True, etag=doc.sha256)
+    resp.cache_control.private = True
+    return resp
+
+
+@bookings_bp.route("/<int:booking_id>/docs.zip", methods=["GET"])
+@login_required
+def docs_zip(booking_id):
+    """
+    Të gjitha dokumentet e booking si ZIP i streamuar (stored; ?compress=1 -> deflate).
+    """
+    b = get_booking_or_404(booking_id)
+    docs = booking_documents(b.id).yield_per(100)
+    return zip_response(
+        f"{b.reference}-documents.zip",
+        document_entries(docs),
+        compress=request.args.get("compress") == "1",
+    )
+
+
+@bookings_bp.route("", methods=["GET"])
+@login_required
+def list_bookings():
+    form = BookingFilterForm(request.args)
+
+    # Base query + join me Client (për kërkim)
+    q = (
+        Booking.query.join(Client, Booking.client_id == Client.id)
+        .options(contains_eager(Booking.client))
+        .filter(Booking.is_archived == False)  # noqa: E712
+    )
+
+    # Populate agent dropdown (admin only)
+    if current_user.role == "admin":
+        agents = User.query.filter_by(role="agent", is_active=True).order_by(User.full_name.asc()).all()
+        form.agent_id.choices = [("", "all")] + [(str(a.id), a.full_name) for a in agents]
+    else:
+        form.agent_id.choices = [("", "all")]
+
+    q = apply_booking_filters(q, form)
+
+    # Keyset pagination mbi (created_at, id): pa OFFSET, çdo faqe kushton njësoj
+    page = keyset_paginate(
+        q,
+        Booking.created_at,
+        Booking.id,
+        per_page=get_per_page(default=15),
+        after=decode_cursor(request.args.get("after")),
+        before=decode_cursor(request.args.get("before")),
+    )
 
     args = request.args.to_dict(flat=True)
-    args.pop("page", None)
+    args.pop("after", None)
+    args.pop("before", None)
 
-    prev_url = None
-    next_url = None
-    if pagination.has_prev:
-        prev_url = url_for("bookings.list_bookings", **args, page=pagination.prev_num)
-    if pagination.has_next:
-        next_url = url_for("bookings.list_bookings", **args, page=pagination.next_num)
+    # Totali ekzakt është opsional: COUNT(*) i cache-uar për scope + filtra
+    total = None
+    ttl = current_app.config.get("LIST_COUNT_CACHE_TTL", 0)
+    if ttl > 0:
+        key = ("bookings", current_user.id, tuple(sorted(args.items())))
+        total = count_cache.get_or_set(key, ttl, lambda: q.order_by(None).count())
+
+    prev_url = url_for("bookings.list_bookings", **args, before=page.prev_cursor) if page.has_prev else None
+    next_url = url_for("bookings.list_bookings", **args, after=page.next_cursor) if page.has_next else None
 
     return render_template(
         "bookings/list.html",
         form=form,
-        bookings=pagination.items,
-        pagination=pagination,
+        bookings=page.items,
+        total=total,
         prev_url=prev_url,
         next_url=next_url,
+        export_args=args,
     )
+
+
+@bookings_bp.route("/export.<any(csv, jsonl):fmt>", methods=["GET"])
+@login_required
+def export(fmt):
+    """
+    Export i bookings me filtrat e listës (BookingFilterForm), bashkë me klientin
+    dhe agregatet e pagesave (ledger + pagesa e fundit). Streamohet me yield_per.
+    """
+    form = BookingFilterForm(request.args)
+
+    last_paid_at = (
+        select(func.max(Payment.paid_at))
+        .where(Payment.booking_id == Booking.id, Payment.is_archived == False)  # noqa: E712
+        .correlate(Booking)
+        .scalar_subquery()
+    )
+
+    q = (
+        db.session.query(Booking)
+        .join(Client, Booking.client_id == Client.id)
+        .join(User, Booking.agent_id == User.id)
+        .filter(Booking.is_archived == False)  # noqa: E712
+    )
+    q = (
+        apply_booking_filters(q, form)
+        .with_entities(
+            Booking.reference,
+            Booking.created_at,
+            User.full_name,
+            Client.first_name,
+            Client.last_name,
+            Client.email,
+            Client.phone,
+            Booking.booking_type,
+            Booking.status,
+            Booking.departure_city,
+            Booking.destination,
+            Booking.travel_date,
+            Booking.return_date,
+            Booking.num_pax,
+            Booking.currency,
+            minor_units(Booking.total_price),
+            minor_units(Booking.internal_cost),
+            minor_units(Booking.paid_total),
+            minor_units(Booking.due_total),
+            Booking.payments_count,
+            last_paid_at,
+        )
+        .order_by(Booking.created_at.desc(), Booking.id.desc())
+        .yield_per(1000)
+    )
+
+    header = [
+        "reference", "created_at", "agent", "first_name", "last_name", "email", "phone",
+        "booking_type", "status", "departure_city", "destination", "travel_date", "return_date",
+        "num_pax", "currency", "revenue", "internal_cost", "paid", "due", "payments", "last_paid_at",
+    ]
+    return export_response(fmt, "bookings", header, q, money=("revenue", "internal_cost", "paid", "due"))
@@ -1,8 +1,15 @@
 from flask import render_template, redirect, url_for, flash, abort, request
 from flask_login import login_required, current_user
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from ..extensions import db
-from ..models import Client, Booking, Document, Payment, ActivityLog
+from ..models import Client, Booking, Document, Payment
+from ..utils.audit import client_timeline, log_action
+from ..utils.cache import invalidate_dashboard
+from ..utils.pagination import get_per_page
+from ..utils.search import client_search_filter, index_client
+from ..utils.zipstream import document_entries, zip_response
 from . import clients_bp
 from .forms import ClientEditForm
 
@@ -14,23 +21,11 @@ def get_client_or_404(client_id: int) -> Client:
     return c
 
 
-def log_action(action, entity_type, entity_id=None, meta=None):
-    db.session.add(
-        ActivityLog(
-            user_id=current_user.id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            meta=meta or {},
-        )
-    )
-
-
 @clients_bp.route("", methods=["GET"])
 @login_required
 def list_clients():
     # Base query: only active (not archived)
-    q = Client.query.filter(Client.is_archived.is_(False))
+    q = Client.query.filter(Client.is_archived == False)  # noqa: E712
 
     # Scope: admin all, agent only own
     if current_user.role != "admin":
@@ -39,16 +34,60 @@ def list_clients():
     # Optional search
     term = (request.args.get("q") or "").strip()
     if term:
-        like = f"%{term}%"
-        q = q.filter(
-            (Client.first_name.ilike(like))
-            | (Client.last_name.ilike(like))
-            | (Client.email.ilike(like))
-            | (Client.phone.ilike(like))
+        q = q.filter(client_search_filter(term))
+
+    # Pagination (DEFAULT_PAGE_SIZE / MAX_PAGE_SIZE nga Config)
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = get_per_page()
+    total = q.with_entities(func.count(Client.id)).scalar() or 0
+    pages = max(1, -(-total // per_page))
+
+    # Vetëm kolonat që shfaq lista (jo entitete të plota ORM)
+    clients = (
+        q.with_entities(
+            Client.id,
+            Client.first_name,
+            Client.last_name,
+            Client.email,
+            Client.phone,
+            Client.created_at,
         )
+        .order_by(Client.created_at.desc(), Client.id.desc())
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+        .all()
+    )
+
+    # Numri i bookings për klientët e faqes: një GROUP BY i kufizuar te këto id
+    booking_counts = {}
+    if clients:
+        booking_counts = dict(
+            db.session.query(Booking.client_id, func.count(Booking.id))
+            .filter(Booking.client_id.in_([c.id for c in clients]))
+            .group_by(Booking.client_id)
+            .all()
+        )
+
+    args = request.args.to_dict(flat=True)
+    args.pop("page", None)
+    prev_url = url_for("clients.list_clients", **args, page=page - 1) if page > 1 else None
+    next_url = url_for("clients.list_clients", **args, page=page + 1) if page < pages else None
+
+    return render_template(
+        "clients/list.html",
+        clients=clients,
+        booking_counts=booking_counts,
+        q=term,
+        page=page,
+        pages=pages,
+        total=total,
+        prev_url=prev_url,
+        next_url=next_url,
+    )
+
 
-    clients = q.order_by(Client.created_at.desc()).all()
-    return render_template("clients/list.html", clients=clients, q=term)
+def client_documents(client_id):
+    return Document.query.filter_by(client_id=client_id, is_archived=False).order_by(Document.created_at.desc())
 
 
 @clients_bp.route("/<int:client_id>", methods=["GET"])
@@ -64,27 +103,20 @@ def detail(client_id):
     )
 
     # Documents (all for this client)
-    docs = (
-        Document.query.filter_by(client_id=client.id, is_archived=False)
-        .order_by(Document.created_at.desc())
-        .all()
-    )
+    docs = client_documents(client.id).all()
 
     # Payments (via booking ids)
     booking_ids = [b.id for b in bookings]
     payments = []
     if booking_ids:
         payments = (
-            Payment.query.filter(Payment.booking_id.in_(booking_ids), Payment.is_archived.is_(False))
+            Payment.query.filter(Payment.booking_id.in_(booking_ids), Payment.is_archived == False)  # noqa: E712
             .order_by(Payment.paid_at.desc())
             .all()
         )
 
-    # Recent logs (simple)
-    logs_q = ActivityLog.query.filter(ActivityLog.entity_type.in_(["Client", "Booking", "Document", "Payment"]))
-    if current_user.role != "admin":
-        logs_q = logs_q.filter(ActivityLog.user_id == current_user.id)
-    recent_logs = logs_q.order_by(ActivityLog.created_at.desc()).limit(15).all()
+    # Historiku i klientit (edhe bookings / payments / documents e tij)
+    timeline = client_timeline(client.id)
 
     return render_template(
         "clients/detail.html",
@@ -92,7 +124,7 @@ def detail(client_id):
         bookings=bookings,
         docs=docs,
         payments=payments,
-        recent_logs=recent_logs,
+        timeline=timeline,
     )
 
 
@@ -114,9 +146,11 @@ def edit(client_id):
         client.nationality = form.nationality.data.strip() if form.nationality.data else None
         client.address = form.address.data.strip() if form.address.data else None
         client.notes = form.notes.data.strip() if form.notes.data else None
+        index_client(client)
 
         log_action("Updated client", "Client", client.id, {"email": client.email, "phone": client.phone})
         db.session.commit()
+        invalidate_dashboard(client.agent_id)
 
         flash("Client updated successfully.", "success")
         return redirect(url_for("clients.detail", client_id=client.id))
@@ -125,3 +159,19 @@ def edit(client_id):
         flash("Form has errors. Please fix highlighted fields.", "danger")
 
     return render_template("clients/edit.html", form=form, client=client)
+
+
+@clients_bp.route("/<int:client_id>/docs.zip", methods=["GET"])
+@login_required
+def docs_zip(client_id):
+    """
+    Të gjitha dokumentet e klientit (nëpër bookings) si ZIP i streamuar,
+    një folder për çdo booking reference.
+    """
+    client = get_client_or_404(client_id)
+    docs = client_documents(client.id).options(joinedload(Document.booking)).yield_per(100)
+    return zip_response(
+        f"client-{client.id}-documents.zip",
+        document_entries(docs, folder=lambda d: d.booking.reference),
+        compress=request.args.get("compress") == "1",
+    )
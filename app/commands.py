@@ -0,0 +1,161 @@
+import click
+from flask.cli import with_appcontext
+
+from .extensions import db
+
+
+@click.command("rebuild-ledgers")
+@with_appcontext
+def rebuild_ledgers_command():
+    """Rebuild booking paid/due totals from payments."""
+    from .utils.ledger import rebuild_ledgers
+
+    n = rebuild_ledgers()
+    db.session.commit()
+    click.echo(f"Ledger rebuilt for {n} bookings.")
+
+
+@click.command("rebuild-rollups")
+@click.option("--date-from", type=click.DateTime(formats=["%Y-%m-%d"]), default=None)
+@click.option("--date-to", type=click.DateTime(formats=["%Y-%m-%d"]), default=None)
+@with_appcontext
+def rebuild_rollups_command(date_from, date_to):
+    """Backfill / rebuild daily_agent_stats from bookings and payments."""
+    from .utils.rollups import rebuild_rollups
+
+    n = rebuild_rollups(
+        date_from=date_from.date() if date_from else None,
+        date_to=date_to.date() if date_to else None,
+    )
+    db.session.commit()
+    click.echo(f"daily_agent_stats: {n} rows rebuilt.")
+
+
+@click.command("rebuild-search")
+@with_appcontext
+def rebuild_search_command():
+    """Rebuild the client/booking search index."""
+    from .utils.search import rebuild_search_index
+
+    clients, bookings = rebuild_search_index()
+    db.session.commit()
+    click.echo(f"Search index rebuilt: {clients} clients, {bookings} bookings.")
+
+
+@click.command("import-bookings")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--agent", "agent_email", required=True, help="Email of the agent the bookings are assigned to.")
+@click.option("--batch-size", default=1000, show_default=True)
+@with_appcontext
+def import_bookings_command(path, agent_email, batch_size):
+    """Bulk import clients + bookings from a CSV / XLSX file."""
+    from .models import User
+    from .utils.importer import import_bookings, read_rows
+
+    agent = User.query.filter_by(email=agent_email.strip().lower()).first()
+    if agent is None:
+        raise click.BadParameter(f"no user with email {agent_email}", param_hint="--agent")
+
+    with open(path, "rb") as f:
+        try:
+            result = import_bookings(read_rows(f, path), agent_id=agent.id, batch_size=batch_size, source=path)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+
+    for line, error in result.errors:
+        click.echo(f"line {line}: {error}", err=True)
+    click.echo(
+        f"Imported {result.bookings} bookings in {result.batches} batches "
+        f"({result.clients_created} new clients, {result.clients_updated} updated, {result.skipped} rows skipped)."
+    )
+
+
+@click.command("docs-gc")
+@click.option("--grace-minutes", default=60, show_default=True, help="Keep unreferenced files newer than this.")
+@click.option("--dry-run", is_flag=True, help="Only report what would be removed.")
+@with_appcontext
+def docs_gc_command(grace_minutes, dry_run):
+    """Remove unreferenced document blobs and expired chunked-upload sessions."""
+    from flask import current_app
+    from .utils.storage import collect_garbage
+    from .utils.uploads import expire_uploads
+
+    uploads = expire_uploads(current_app.config.get("UPLOAD_SESSION_TTL", 24 * 3600), dry_run=dry_run)
+    stats = collect_garbage(grace_seconds=grace_minutes * 60, dry_run=dry_run)
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    click.echo(
+        f"{'Would remove' if dry_run else 'Removed'} {stats['blobs']} blobs, {stats['orphans']} orphan files, "
+        f"{stats['temp']} temp files ({stats['bytes']} bytes), {uploads} expired upload sessions."
+    )
+
+
+@click.command("docs-previews")
+@click.option("--limit", type=int, default=None, help="Process at most N documents.")
+@with_appcontext
+def docs_previews_command(limit):
+    """Generate pending document previews (and optimise originals if enabled)."""
+    from .utils.previews import pillow_available, process_pending
+
+    if not pillow_available():
+        raise click.ClickException("Pillow is not installed (pip install Pillow).")
+    ready, failed = process_pending(limit=limit)
+    click.echo(f"Previews: {ready} ready, {failed} failed.")
+
+
+@click.command("logs-archive")
+@click.option("--months", type=int, default=None, help="Keep this many months (default LOG_RETENTION_MONTHS).")
+@click.option("--batch-size", default=5000, show_default=True)
+@click.option("--pause", default=0.0, show_default=True, help="Seconds to sleep between batches.")
+@click.option("--vacuum", is_flag=True, help="Reclaim space after archiving (VACUUM).")
+@click.option("--dry-run", is_flag=True, help="Only count the rows that would be archived.")
+@with_appcontext
+def logs_archive_command(months, batch_size, pause, vacuum, dry_run):
+    """Move old activity logs to gzip JSON Lines files, partitioned by month."""
+    from flask import current_app
+    from .utils.log_archive import archive_logs, compact
+
+    if months is None:
+        months = current_app.config.get("LOG_RETENTION_MONTHS", 12)
+    if months < 1:
+        raise click.BadParameter("must be at least 1", param_hint="--months")
+
+    stats = archive_logs(months, batch_size=batch_size, dry_run=dry_run, pause=pause)
+    cutoff = stats["cutoff"].date().isoformat()
+    if dry_run:
+        click.echo(f"Would archive {stats['rows']} logs older than {cutoff}.")
+        return
+    click.echo(f"Archived {stats['rows']} logs older than {cutoff} in {stats['batches']} batches ({stats['files']} files).")
+    if vacuum and stats["rows"]:
+        compact()
+        click.echo("Vacuum done.")
+
+
+@click.command("fx-load")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def fx_load_command(path):
+    """Load daily FX rates to BASE_CURRENCY from a CSV (date,currency,rate)."""
+    from .utils.fx import load_rates, read_rates
+
+    with open(path, "rb") as f:
+        try:
+            rows = read_rates(f)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    n = load_rates(rows)
+    db.session.commit()
+    click.echo(f"Loaded {n} FX rates.")
+
+
+def register_commands(app):
+    app.cli.add_command(rebuild_ledgers_command)
+    app.cli.add_command(rebuild_rollups_command)
+    app.cli.add_command(rebuild_search_command)
+    app.cli.add_command(import_bookings_command)
+    app.cli.add_command(docs_gc_command)
+    app.cli.add_command(docs_previews_command)
+    app.cli.add_command(logs_archive_command)
+    app.cli.add_command(fx_load_command)
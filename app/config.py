@@ -30,11 +30,42 @@ class Config:
     )
     MAX_CONTENT_LENGTH = 20 * 1024 * 1024  # 20 MB per file
 
+    # Shkarkimi i dokumenteve (utils/storage.send_document):
+    # - nginx: location internal që tregon te UPLOAD_FOLDER, p.sh. /_uploads
+    # - Apache mod_xsendfile / lighttpd: USE_X_SENDFILE=1
+    # - asnjëra: send_file nga Flask (sendfile nga serveri WSGI)
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get("X_ACCEL_REDIRECT_PREFIX", "")
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE") == "1"
+
+    # Upload me copa (utils/uploads.py), për skedarë mbi MAX_CONTENT_LENGTH
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # < MAX_CONTENT_LENGTH
+    UPLOAD_MAX_SIZE = int(os.environ.get("UPLOAD_MAX_SIZE", 2 * 1024 ** 3))  # 2 GB
+    UPLOAD_SESSION_TTL = int(os.environ.get("UPLOAD_SESSION_TTL", 24 * 3600))  # sekonda pa aktivitet
+
+    # Preview / optimizim imazhesh në background (utils/previews.py, kërkon Pillow)
+    PREVIEW_WORKERS = int(os.environ.get("PREVIEW_WORKERS", 2))  # 0 = vetëm `flask docs-previews`
+    PREVIEW_SIZE = 480  # px, ana më e gjatë
+    IMAGE_OPTIMIZE_ORIGINALS = os.environ.get("IMAGE_OPTIMIZE_ORIGINALS") == "1"
+    IMAGE_MAX_DIMENSION = 2560  # origjinalet JPEG/PNG më të mëdha ri-kodohen (nëse aktivizuar)
+
+    # =========================
+    # Audit log (utils/audit.py)
+    # =========================
+    AUDIT_ASYNC = os.environ.get("AUDIT_ASYNC") == "1"  # shkrim pas commit, në thread background
+    AUDIT_QUEUE_SIZE = 10000  # commit-e në pritje; kur mbushet, shkruhet direkt
+    AUDIT_BATCH_SIZE = 500
+
+    # Retention: `flask logs-archive` kalon log-et më të vjetra te skedarë gzip JSONL
+    LOG_RETENTION_MONTHS = int(os.environ.get("LOG_RETENTION_MONTHS", 12))
+    LOG_ARCHIVE_FOLDER = os.environ.get("LOG_ARCHIVE_FOLDER", str(BASE_DIR / "log_archive"))
+    LOG_ARCHIVE_SEARCH_MONTHS = int(os.environ.get("LOG_ARCHIVE_SEARCH_MONTHS", 6))  # partitione për kërkim (/reports/audit)
+
     # =========================
     # Business settings
     # =========================
     BASE_CURRENCY = "EUR"
     SUPPORTED_CURRENCIES = ["EUR", "ALL", "USD", "GBP"]
+    FX_CACHE_TTL = int(os.environ.get("FX_CACHE_TTL", 3600))  # kurset në proces (utils/fx.get_rate)
 
     # =========================
     # Pagination (future-proof)
@@ -42,6 +73,13 @@ class Config:
     DEFAULT_PAGE_SIZE = 25
     MAX_PAGE_SIZE = 100
 
+    # =========================
+    # Caching
+    # =========================
+    DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 30))  # sekonda, 0 = pa cache
+    LIST_COUNT_CACHE_TTL = int(os.environ.get("LIST_COUNT_CACHE_TTL", 60))  # 0 = pa total në lista
+    TIMESERIES_CACHE_TTL = int(os.environ.get("TIMESERIES_CACHE_TTL", 3600))  # bucket-et e mbyllura, 0 = pa cache
+
     # =========================
     # Security
     # =========================
@@ -54,3 +92,10 @@ class Config:
     # =========================
     ENV = os.environ.get("FLASK_ENV", "development")
     DEBUG = ENV == "development"
+
+    # =========================
+    # N+1 detector (debug / testing)
+    # =========================
+    LAZY_LOAD_DETECTOR = DEBUG
+    LAZY_LOAD_THRESHOLD = int(os.environ.get("LAZY_LOAD_THRESHOLD", 5))  # lazy loads për request
+    LAZY_LOAD_RAISE = os.environ.get("LAZY_LOAD_RAISE") == "1"
@@ -1,53 +1,98 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, current_app, render_template
 from flask_login import login_required, current_user
-from sqlalchemy import func
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
 from ..extensions import db
-from ..models import Booking, Client, Payment, ActivityLog
+from ..models import Booking, Client, ActivityLog
+from ..utils.cache import dashboard_cache, dashboard_scope
+from ..utils.money import ZERO, money
+from ..utils.rollups import rollup_totals
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
-BASE = "EUR"
 
-@dashboard_bp.route("/dashboard")
-@login_required
-def home():
-    # Scope (admin sees all, agent sees own)
-    bookings_q = Booking.query.filter_by(is_archived=False)
-    clients_q = Client.query.filter_by(is_archived=False)
-    payments_q = Payment.query.filter_by(is_archived=False)
+def count_if(cond):
+    return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
 
-    if current_user.role != "admin":
-        bookings_q = bookings_q.filter(Booking.agent_id == current_user.id)
-        clients_q = clients_q.filter(Client.agent_id == current_user.id)
-        payments_q = payments_q.filter(Payment.agent_id == current_user.id)
 
-    total_bookings = bookings_q.count()
-    active_bookings = bookings_q.filter(Booking.status != "completed").count()
+def compute_dashboard(agent_id):
+    """
+    KPI + top destinations për një scope (agent_id=None => të gjithë).
+    3 query agregate + 1 group by, në vend të ~10 round trips.
+    """
+    # Bookings: të gjitha count-et në një kalim (conditional aggregation)
+    bq = db.session.query(
+        func.count(Booking.id),
+        count_if(Booking.status != "completed"),
+        count_if(Booking.status == "pending_payment"),
+    ).filter(Booking.is_archived == False)  # noqa: E712
+
+    # Clients: aktivë + të arkivuar në një kalim
+    cq = db.session.query(
+        count_if(Client.is_archived == False),  # noqa: E712
+        count_if(Client.is_archived == True),  # noqa: E712
+    )
+
+    if agent_id is not None:
+        bq = bq.filter(Booking.agent_id == agent_id)
+        cq = cq.filter(Client.agent_id == agent_id)
+
+    total_bookings, active_bookings, pending_payment = bq.one()
+    total_clients, archived_clients = cq.one()
 
-    total_clients = clients_q.count()
-    archived_clients = Client.query.filter_by(is_archived=True).count() if current_user.role == "admin" else \
-        Client.query.filter_by(is_archived=True, agent_id=current_user.id).count()
+    # Shumat (revenue, paid) nga rollup-et ditore, të konvertuara në BASE_CURRENCY (fx_rates)
+    totals = rollup_totals(agent_id=agent_id)
 
-    # Payments converted to BASE using a simple rule:
-    # For now: assume amount already entered in base currency if currency != base.
-    # We'll add fx_rate field later if you want strict conversion per payment.
-    # (We can improve in Sprint 2)
-    collected_eur = float(payments_q.with_entities(func.coalesce(func.sum(Payment.amount), 0)).scalar() or 0)
-    total_payments = payments_q.count()
+    collected_eur = money(totals["paid"])
+    total_payments = int(totals["payments"])
 
     # Outstanding (base) = sum(total_price) - sum(payments)
-    revenue_eur = float(bookings_q.with_entities(func.coalesce(func.sum(Booking.total_price), 0)).scalar() or 0)
-    outstanding_eur = max(0.0, revenue_eur - collected_eur)
+    revenue_eur = money(totals["revenue"])
+    outstanding_eur = max(ZERO, revenue_eur - collected_eur)
 
-    pending_payment = bookings_q.filter(Booking.status == "pending_payment").count()
+    top_q = db.session.query(Booking.destination, func.count(Booking.id)).filter(Booking.is_archived == False)  # noqa: E712
+    if agent_id is not None:
+        top_q = top_q.filter(Booking.agent_id == agent_id)
+    top_destinations = [
+        tuple(row)
+        for row in top_q.group_by(Booking.destination).order_by(func.count(Booking.id).desc()).limit(6).all()
+    ]
+
+    kpi = {
+        "total_bookings": int(total_bookings),
+        "active_bookings": int(active_bookings),
+        "total_clients": int(total_clients),
+        "archived_clients": int(archived_clients),
+        "collected_eur": collected_eur,
+        "total_payments": total_payments,
+        "outstanding_eur": outstanding_eur,
+        "pending_payment": int(pending_payment),
+        "missing_fx": int(totals["missing_fx"] or 0),
+    }
+    return kpi, top_destinations
 
-    recent_bookings = bookings_q.order_by(Booking.created_at.desc()).limit(10).all()
 
-    top_destinations = (
-        bookings_q.with_entities(Booking.destination, func.count(Booking.id))
-        .group_by(Booking.destination)
-        .order_by(func.count(Booking.id).desc())
-        .limit(6)
+@dashboard_bp.route("/dashboard")
+@login_required
+def home():
+    # Scope (admin sees all, agent sees own)
+    scope = dashboard_scope(current_user)
+    agent_id = None if scope == "all" else scope
+
+    kpi, top_destinations = dashboard_cache.get_or_set(
+        scope,
+        current_app.config.get("DASHBOARD_CACHE_TTL", 0),
+        lambda: compute_dashboard(agent_id),
+    )
+
+    bookings_q = Booking.query.filter_by(is_archived=False)
+    if agent_id is not None:
+        bookings_q = bookings_q.filter(Booking.agent_id == agent_id)
+
+    recent_bookings = (
+        bookings_q.options(joinedload(Booking.client))
+        .order_by(Booking.created_at.desc())
+        .limit(10)
         .all()
     )
 
@@ -57,17 +102,6 @@ def home():
 
     recent_logs = logs_q.order_by(ActivityLog.created_at.desc()).limit(8).all()
 
-    kpi = {
-        "total_bookings": total_bookings,
-        "active_bookings": active_bookings,
-        "total_clients": total_clients,
-        "archived_clients": archived_clients,
-        "collected_eur": collected_eur,
-        "total_payments": total_payments,
-        "outstanding_eur": outstanding_eur,
-        "pending_payment": pending_payment,
-    }
-
     return render_template(
         "dashboard/home.html",
         kpi=kpi,
@@ -1,8 +1,10 @@
 from datetime import datetime, date
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import case
 from sqlalchemy.dialects.sqlite import JSON
 from .extensions import db, login_manager
+from .utils.money import ZERO, Money, money
 from app.extensions import db
 
 
@@ -59,7 +61,7 @@ class Client(db.Model):
     notes = db.Column(db.Text, nullable=True)
     tags = db.Column(JSON, default=list)
 
-    is_archived = db.Column(db.Boolean, default=False)
+    is_archived = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     archived_at = db.Column(db.DateTime, nullable=True)
     archived_by = db.Column(db.Integer, nullable=True)
 
@@ -73,6 +75,10 @@ class Client(db.Model):
 # =========================
 class Booking(db.Model):
     __tablename__ = "bookings"
+    __table_args__ = (
+        db.Index("ix_bookings_created_at_id", "created_at", "id"),
+        db.Index("ix_bookings_agent_archived_created", "agent_id", "is_archived", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     reference = db.Column(db.String(30), unique=True, nullable=False, index=True)
@@ -98,24 +104,29 @@ class Booking(db.Model):
 
     currency = db.Column(db.String(10), default="EUR")
 
-    total_price = db.Column(db.Float, default=0)
-    discount = db.Column(db.Float, default=0)
-    service_fee = db.Column(db.Float, default=0)
-    extras_total = db.Column(db.Float, default=0)
+    total_price = db.Column(Money, default=0)
+    discount = db.Column(Money, default=0)
+    service_fee = db.Column(Money, default=0)
+    extras_total = db.Column(Money, default=0)
 
-    internal_cost = db.Column(db.Float, default=0)
+    internal_cost = db.Column(Money, default=0)
 
     commission_percent_override = db.Column(db.Float, nullable=True)
 
     status = db.Column(db.String(40), default="new")
 
     cancel_reason = db.Column(db.String(255), nullable=True)
-    refund_amount = db.Column(db.Float, nullable=True)
+    refund_amount = db.Column(Money, nullable=True)
     refund_date = db.Column(db.Date, nullable=True)
 
     invoice_no = db.Column(db.String(40), nullable=True)
 
-    is_archived = db.Column(db.Boolean, default=False)
+    # Ledger (denormalized nga payments, mbahet nga apply_payment / Payment.archive)
+    paid_total = db.Column(Money, nullable=False, default=0, server_default="0")
+    due_total = db.Column(Money, nullable=False, default=0, server_default="0")
+    payments_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    is_archived = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     archived_at = db.Column(db.DateTime, nullable=True)
     archived_by = db.Column(db.Integer, nullable=True)
 
@@ -125,10 +136,25 @@ class Booking(db.Model):
     documents = db.relationship("Document", backref="booking", lazy=True)
 
     def paid_amount(self):
-        return sum(p.amount for p in self.payments)
+        return self.paid_total or 0
 
     def due_amount(self):
-        return max(0, self.total_price - self.paid_amount())
+        return self.due_total or 0
+
+    def apply_payment(self, amount, count=1):
+        """
+        Shton një pagesë te ledger-i (amount/count negativ për archive/refund).
+        Update bëhet në SQL (paid_total = paid_total + x), që dy pagesa
+        njëkohësisht në të njëjtin booking të mos mbishkruajnë njëra-tjetrën.
+        """
+        paid = Booking.paid_total + amount
+        self.paid_total = paid
+        self.payments_count = Booking.payments_count + count
+        self.due_total = due_expr(Booking.total_price, paid)
+
+    def refresh_due(self):
+        # pas ndryshimit të total_price (create / edit)
+        self.due_total = max(ZERO, money(self.total_price) - money(self.paid_total))
 
     def profit(self):
         return max(0, self.total_price - self.internal_cost)
@@ -139,20 +165,35 @@ class Booking(db.Model):
 # =========================
 class Payment(db.Model):
     __tablename__ = "payments"
+    __table_args__ = (db.Index("ix_payments_agent_paid_at", "agent_id", "paid_at"),)
 
     id = db.Column(db.Integer, primary_key=True)
-    booking_id = db.Column(db.Integer, db.ForeignKey("bookings.id"), nullable=False)
+    booking_id = db.Column(db.Integer, db.ForeignKey("bookings.id"), nullable=False, index=True)
     agent_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
     currency = db.Column(db.String(10), default="EUR")
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     method = db.Column(db.String(20), default="cash")
 
     receipt_no = db.Column(db.String(40), nullable=True)
-    paid_at = db.Column(db.DateTime, default=datetime.utcnow)
+    paid_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     note = db.Column(db.String(255), nullable=True)
 
-    is_archived = db.Column(db.Boolean, default=False)
+    is_archived = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+
+    def archive(self):
+        from .utils.rollups import record_payment
+
+        if self.is_archived:
+            return
+        self.is_archived = True
+        self.booking.apply_payment(-self.amount, count=-1)
+        record_payment(self, sign=-1)
+
+
+def due_expr(total, paid):
+    """max(0, total - paid) si shprehje SQL (punon në SQLite dhe PostgreSQL)."""
+    return case((total - paid > 0, total - paid), else_=0)
 
 
 # =========================
@@ -169,6 +210,12 @@ class Document(db.Model):
     file_path = db.Column(db.String(400), nullable=False)
     original_name = db.Column(db.String(255), nullable=True)
 
+    # Content-addressed storage (utils/storage.py); NULL për dokumentet e vjetra
+    sha256 = db.Column(db.String(64), db.ForeignKey("blobs.sha256"), nullable=True, index=True)
+    size_bytes = db.Column(db.BigInteger, nullable=True)
+    # Thumbnail (utils/previews.py): pending / ready / failed; NULL = jo imazh
+    preview_status = db.Column(db.String(20), nullable=True, index=True)
+
     is_required = db.Column(db.Boolean, default=False)
 
     uploaded_by = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -177,11 +224,116 @@ class Document(db.Model):
     is_archived = db.Column(db.Boolean, default=False)
 
 
+# =========================
+# BLOB (content-addressed file)
+# =========================
+class Blob(db.Model):
+    __tablename__ = "blobs"
+
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size_bytes = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # upload-i i fundit që e referoi (edhe pa commit ende); docs-gc nuk e prek brenda grace
+    last_acquired_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# =========================
+# UPLOAD SESSION (chunked / resumable)
+# =========================
+class UploadSession(db.Model):
+    __tablename__ = "upload_sessions"
+
+    id = db.Column(db.String(32), primary_key=True)  # token i rastësishëm (uuid4 hex)
+    booking_id = db.Column(db.Integer, db.ForeignKey("bookings.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+
+    doc_type = db.Column(db.String(50), nullable=False)
+    is_required = db.Column(db.Boolean, nullable=False, default=False)
+    original_name = db.Column(db.String(255), nullable=False)
+
+    total_size = db.Column(db.BigInteger, nullable=False)
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+    sha256 = db.Column(db.String(64), nullable=True)  # i deklaruar nga klienti, verifikohet në finalize
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+# =========================
+# DAILY AGENT STATS (rollup)
+# =========================
+class DailyAgentStats(db.Model):
+    """
+    Totale ditore për (day, agent, currency), mbahen në të njëjtin transaksion
+    me shkrimet e bookings/payments (app/utils/rollups.py).
+    - bookings/revenue/internal_cost: sipas Booking.created_at
+    - paid/payments: sipas Payment.paid_at
+    """
+    __tablename__ = "daily_agent_stats"
+    __table_args__ = (db.Index("ix_daily_agent_stats_agent_day", "agent_id", "day"),)
+
+    day = db.Column(db.Date, primary_key=True)
+    agent_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    currency = db.Column(db.String(10), primary_key=True)
+
+    bookings = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    revenue = db.Column(Money, nullable=False, default=0, server_default="0")
+    internal_cost = db.Column(Money, nullable=False, default=0, server_default="0")
+    paid = db.Column(Money, nullable=False, default=0, server_default="0")
+    payments = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+# =========================
+# FX RATES
+# =========================
+class FxRate(db.Model):
+    """
+    Kursi ditor: 1 njësi `currency` = `rate` njësi BASE_CURRENCY (app/utils/fx.py).
+    Për një ditë pa kurs përdoret kursi i fundit para saj.
+    """
+    __tablename__ = "fx_rates"
+
+    currency = db.Column(db.String(10), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    rate = db.Column(db.Float, nullable=False)
+
+
+# =========================
+# CACHE VERSIONS
+# =========================
+class CacheVersion(db.Model):
+    """
+    Numër versioni për një grup cache-sh në proces (app/utils/cache.py): rritet në të njëjtin
+    transaksion me ndryshimin e të dhënave, dhe çdo worker e lexon në çelësat e cache-it.
+    """
+    __tablename__ = "cache_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+
+# =========================
+# SEQUENCES (booking reference / receipt / invoice)
+# =========================
+class Sequence(db.Model):
+    __tablename__ = "sequences"
+
+    name = db.Column(db.String(40), primary_key=True)  # p.sh. "OUT-2026", "RCPT-2026", "INV-2026"
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+
 # =========================
 # ACTIVITY LOG
 # =========================
 class ActivityLog(db.Model):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        db.Index("ix_activity_logs_entity_created", "entity_type", "entity_id", "created_at"),
+        db.Index("ix_activity_logs_booking_created", "booking_id", "created_at"),
+        db.Index("ix_activity_logs_client_created", "client_id", "created_at"),
+        db.Index("ix_activity_logs_user_created", "user_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
@@ -190,6 +342,11 @@ class ActivityLog(db.Model):
     entity_type = db.Column(db.String(50), nullable=False)
     entity_id = db.Column(db.Integer, nullable=True)
 
+    # Lidhjet për timeline (payment / document -> booking -> client); pa FK,
+    # log-u mbetet edhe kur entiteti fshihet ose arkivohet jashtë DB
+    booking_id = db.Column(db.Integer, nullable=True)
+    client_id = db.Column(db.Integer, nullable=True)
+
     meta = db.Column(JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
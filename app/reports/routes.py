@@ -1,10 +1,21 @@
 from datetime import datetime, date
-from flask import render_template, request, abort
+from flask import render_template, request, abort, url_for, jsonify
 from flask_login import login_required, current_user
-from sqlalchemy import func
+from sqlalchemy import case, func, or_, select, type_coerce
+from sqlalchemy.orm import joinedload
 
 from ..extensions import db
-from ..models import Booking, Payment, User
+from ..models import ActivityLog, Booking, Client, DailyAgentStats, Payment, User
+from ..utils.audit import recent_logs
+from ..utils.dates import GRAINS, datetime_range
+from ..utils.export import csv_response, export_response
+from ..utils.fx import rate_expr, to_base
+from ..utils.log_archive import archive_months, search_archive, search_months
+from ..utils.money import ZERO, Money, format_many, minor_units, money
+from ..utils.pagination import decode_cursor, get_per_page, keyset_paginate
+from ..utils.rollups import rollup_totals
+from ..utils.search import client_search_filter
+from ..utils.timeseries import DIMENSIONS, METRICS, build_series, default_range
 from . import reports_bp
 
 
@@ -30,66 +41,81 @@ def booking_scope_query(agent_id: int | None, date_from: date | None, date_to: d
     """
     Kthen query për bookings me scope + filters.
     - agent_id: None => all agents (vetëm admin)
-    - date_from/to: filtron sipas Booking.created_at (DATE)
+    - date_from/to: filtron sipas Booking.created_at (range gjysmë e hapur)
     """
-    q = Booking.query.filter(func.coalesce(Booking.is_archived, False) == False)  # noqa: E712
+    q = Booking.query.filter(Booking.is_archived == False)  # noqa: E712
 
     if agent_id is not None:
         q = q.filter(Booking.agent_id == agent_id)
 
-    if date_from:
-        q = q.filter(func.date(Booking.created_at) >= date_from)
-    if date_to:
-        q = q.filter(func.date(Booking.created_at) <= date_to)
-
-    return q
+    return q.filter(*datetime_range(Booking.created_at, date_from, date_to))
 
 
 def payments_scope_query(agent_id: int | None, date_from: date | None, date_to: date | None):
     """
     Payments në të njëjtën periudhë, për total Paid.
     """
-    q = Payment.query.filter(func.coalesce(Payment.is_archived, False) == False)  # noqa: E712
+    q = Payment.query.filter(Payment.is_archived == False)  # noqa: E712
 
     if agent_id is not None:
         q = q.filter(Payment.agent_id == agent_id)
 
-    if date_from:
-        q = q.filter(func.date(Payment.paid_at) >= date_from)
-    if date_to:
-        q = q.filter(func.date(Payment.paid_at) <= date_to)
-
-    return q
+    return q.filter(*datetime_range(Payment.paid_at, date_from, date_to))
 
 
 def compute_kpis(agent_id: int | None, date_from: date | None, date_to: date | None):
-    # Bookings KPIs
-    bq = booking_scope_query(agent_id, date_from, date_to)
+    """
+    KPI nga rollup-et ditore (daily_agent_stats), një query e vetme, në BASE_CURRENCY.
+    """
+    totals = rollup_totals(agent_id, date_from, date_to)
+    kpis = kpis_from_totals(totals["bookings"], totals["revenue"], totals["internal_cost"], totals["paid"])
+    kpis["missing_fx"] = int(totals["missing_fx"] or 0)
+    return kpis
 
-    total_bookings = bq.with_entities(func.count(Booking.id)).scalar() or 0
-    revenue = bq.with_entities(func.coalesce(func.sum(Booking.total_price), 0.0)).scalar() or 0.0
-    internal_cost = bq.with_entities(func.coalesce(func.sum(Booking.internal_cost), 0.0)).scalar() or 0.0
 
-    profit = float(revenue) - float(internal_cost)
+def compute_kpis_live(agent_id: int | None, date_from: date | None, date_to: date | None):
+    """
+    KPI direkt nga bookings/payments (pa rollup) - për kontroll dhe benchmark.
+    Dy query gjithsej: një agregat për të gjitha KPI e bookings, një për payments.
+    Shumat konvertohen në BASE_CURRENCY me kursin e ditës (created_at / paid_at).
+    """
+    # Bookings KPIs (count + revenue + internal cost në një kalim)
+    total_bookings, revenue, internal_cost = booking_scope_query(agent_id, date_from, date_to).with_entities(
+        func.count(Booking.id),
+        func.coalesce(func.sum(to_base(Booking.total_price, Booking.currency, Booking.created_at)), 0),
+        func.coalesce(func.sum(to_base(Booking.internal_cost, Booking.currency, Booking.created_at)), 0),
+    ).one()
 
     # Paid KPIs
-    pq = payments_scope_query(agent_id, date_from, date_to)
-    paid = pq.with_entities(func.coalesce(func.sum(Payment.amount), 0.0)).scalar() or 0.0
+    paid = payments_scope_query(agent_id, date_from, date_to).with_entities(
+        func.coalesce(func.sum(to_base(Payment.amount, Payment.currency, Payment.paid_at)), 0),
+    ).scalar()
+
+    return kpis_from_totals(total_bookings, revenue, internal_cost, paid)
+
+
+def kpis_from_totals(total_bookings, revenue, internal_cost, paid):
+    # shumat vijnë si Decimal (Money); money() vetëm për None / rezultatet bosh
+    total_bookings = int(total_bookings or 0)
+    revenue = money(revenue)
+    internal_cost = money(internal_cost)
+    paid = money(paid)
 
-    due = float(revenue) - float(paid)
+    profit = revenue - internal_cost
+    due = revenue - paid
 
-    avg_booking = (float(revenue) / total_bookings) if total_bookings else 0.0
-    margin = (profit / float(revenue) * 100.0) if float(revenue) > 0 else 0.0
+    avg_booking = money(revenue / total_bookings) if total_bookings else ZERO
+    margin = float(profit / revenue * 100) if revenue > 0 else 0.0
 
     return {
-        "total_bookings": int(total_bookings),
-        "revenue": float(revenue),
-        "paid": float(paid),
-        "due": float(due),
-        "internal_cost": float(internal_cost),
-        "profit": float(profit),
-        "avg_booking": float(avg_booking),
-        "margin": float(margin),
+        "total_bookings": total_bookings,
+        "revenue": revenue,
+        "paid": paid,
+        "due": due,
+        "internal_cost": internal_cost,
+        "profit": profit,
+        "avg_booking": avg_booking,
+        "margin": margin,
     }
 
 
@@ -169,19 +195,238 @@ def agent_report(agent_id):
         date_to=date_to.isoformat() if date_to else "",
     )
 
-@reports_bp.route("/outstanding", methods=["GET"])
+
+LEADERBOARD_COLUMNS = ["bookings", "revenue", "paid", "due", "internal_cost", "profit", "margin", "payments", "missing_fx"]
+LEADERBOARD_MONEY = ("revenue", "paid", "due", "internal_cost", "profit")
+
+
+def money_table(rows, columns):
+    """
+    Rreshtat e një tabele raporti si dict, me kolonat e parave të formatuara
+    kolonë për kolonë (format_many) në vend të filtrit `money` për çdo qelizë.
+    """
+    table = [dict(r._mapping) if hasattr(r, "_mapping") else dict(r) for r in rows]
+    for c in columns:
+        for row, text in zip(table, format_many([row[c] for row in table])):
+            row[c] = text
+    return table
+
+
+def leaderboard_query(date_from, date_to, sort="revenue", descending=True):
+    """
+    Një rresht për çdo agjent (edhe pa aktivitet, edhe jo aktiv) + përdoruesit e tjerë me
+    aktivitet në periudhë. Një GROUP BY mbi daily_agent_stats (si compute_kpis), shumat në
+    BASE_CURRENCY; profit / due / margin llogariten në SQL që renditja të jetë në DB.
+    missing_fx = rreshta rollup (ditë/monedhë) pa kurs, që nuk hyjnë në shumat e agjentit.
+    """
+    stats = DailyAgentStats
+    conds = []
+    if date_from:
+        conds.append(stats.day >= date_from)
+    if date_to:
+        conds.append(stats.day <= date_to)
+
+    # kursi një herë për rresht rollup-i (si rollup_totals); rreshtat pa kurs -> missing_fx
+    rated = select(
+        stats.agent_id,
+        stats.bookings,
+        stats.revenue,
+        stats.internal_cost,
+        stats.paid,
+        stats.payments,
+        rate_expr(stats.currency, stats.day).label("rate"),
+    ).where(*conds).subquery()
+
+    def converted(column):
+        return func.sum(type_coerce(column * rated.c.rate, Money))
+
+    per_agent = (
+        select(
+            rated.c.agent_id,
+            func.sum(rated.c.bookings).label("bookings"),
+            converted(rated.c.revenue).label("revenue"),
+            converted(rated.c.internal_cost).label("internal_cost"),
+            converted(rated.c.paid).label("paid"),
+            func.sum(rated.c.payments).label("payments"),
+            func.sum(case((rated.c.rate.is_(None), 1), else_=0)).label("missing_fx"),
+        )
+        .group_by(rated.c.agent_id)
+        .subquery()
+    )
+
+    def amount(expr):
+        return type_coerce(func.coalesce(expr, 0), Money)
+
+    revenue = amount(per_agent.c.revenue)
+    internal_cost = amount(per_agent.c.internal_cost)
+    paid = amount(per_agent.c.paid)
+    columns = {
+        "bookings": func.coalesce(per_agent.c.bookings, 0),
+        "revenue": revenue,
+        "paid": paid,
+        "due": type_coerce(revenue - paid, Money),
+        "internal_cost": internal_cost,
+        "profit": type_coerce(revenue - internal_cost, Money),
+        "margin": case(
+            (revenue > 0, (revenue - internal_cost) * 100.0 / revenue),
+            else_=0.0,
+        ),
+        "payments": func.coalesce(per_agent.c.payments, 0),
+        "missing_fx": func.coalesce(per_agent.c.missing_fx, 0),
+    }
+
+    order = columns.get(sort, columns["revenue"])
+    return (
+        select(User.id, User.full_name, User.email, User.is_active, *[c.label(k) for k, c in columns.items()])
+        .outerjoin(per_agent, per_agent.c.agent_id == User.id)
+        .where(or_(User.role == "agent", per_agent.c.agent_id.is_not(None)))
+        .order_by(order.desc() if descending else order.asc(), User.full_name.asc())
+    )
+
+
+def leaderboard_args():
+    sort = request.args.get("sort", "revenue")
+    if sort not in LEADERBOARD_COLUMNS:
+        sort = "revenue"
+    return {
+        "date_from": parse_date((request.args.get("date_from") or "").strip()),
+        "date_to": parse_date((request.args.get("date_to") or "").strip()),
+        "sort": sort,
+        "descending": request.args.get("dir", "desc") != "asc",
+    }
+
+
+@reports_bp.route("/leaderboard", methods=["GET"])
 @login_required
-def outstanding():
+def leaderboard():
     """
-    Bookings me due > 0
-    - Admin: all agents + filter by agent
-    - Agent: only own
-    Filters: date range (created_at), destination, status
+    Vetëm admin: të gjithë agjentët në një tabelë, e renditshme sipas çdo kolone.
+    """
+    require_admin()
+    args = leaderboard_args()
+    rows = money_table(db.session.execute(leaderboard_query(**args)), LEADERBOARD_MONEY)
+
+    filters = {
+        "date_from": args["date_from"].isoformat() if args["date_from"] else "",
+        "date_to": args["date_to"].isoformat() if args["date_to"] else "",
+    }
+    return render_template(
+        "reports/leaderboard.html",
+        rows=rows,
+        columns=LEADERBOARD_COLUMNS,
+        sort=args["sort"],
+        descending=args["descending"],
+        filters=filters,
+        **filters,
+    )
+
+
+@reports_bp.route("/leaderboard.<any(csv, jsonl):fmt>", methods=["GET"])
+@login_required
+def leaderboard_export(fmt):
+    require_admin()
+    result = db.session.execute(leaderboard_query(**leaderboard_args()))
+    header = ["agent_id", "agent", "email", "is_active", *LEADERBOARD_COLUMNS]
+    margin = header.index("margin")
+
+    def rows():
+        for row in result:
+            values = list(row)
+            values[margin] = round(values[margin] or 0.0, 2)
+            yield values
+
+    return export_response(fmt, "leaderboard", header, rows())
+
+
+def timeseries_args():
+    """report_filters + grain (day/week/month) dhe dimension (bosh = totali)."""
+    filters = report_filters()
+    grain = request.args.get("grain", "day")
+    if grain not in GRAINS:
+        grain = "day"
+    dimension = request.args.get("dimension") or None
+    if dimension not in DIMENSIONS:
+        dimension = None
+
+    start, end = default_range(grain)
+    date_from = filters["date_from"] or start
+    date_to = filters["date_to"] or end
+    if date_from > date_to:
+        date_from, date_to = date_to, date_from
+    return {
+        "grain": grain,
+        "dimension": dimension,
+        "agent_id": filters["agent_id"],
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
+
+def series_json(data):
+    # Decimal -> float, date -> ISO (për Chart.js / API)
+    def point(p):
+        return {m: float(p[m]) if m != "bookings" else p[m] for m in METRICS}
+
+    return {
+        "grain": data["grain"],
+        "dimension": data["dimension"],
+        "buckets": [b.isoformat() for b in data["buckets"]],
+        "totals": [point(p) for p in data["totals"]],
+        "missing_fx": data["missing_fx"],
+        "series": [
+            {"key": s["key"], "label": s["label"], "points": [point(p) for p in s["points"]]}
+            for s in data["series"]
+        ],
+    }
+
+
+@reports_bp.route("/timeseries", methods=["GET"])
+@login_required
+def timeseries():
+    """
+    Revenue / bookings / paid / profit sipas ditës, javës ose muajit (opsionalisht sipas
+    agjentit, destination ose booking_type). Agent => vetëm të vetat.
+    """
+    args = timeseries_args()
+    data = build_series(**args)
+
+    agents = []
+    if current_user.role == "admin":
+        agents = User.query.filter_by(role="agent", is_active=True).order_by(User.full_name.asc()).all()
+
+    filters = {
+        "grain": args["grain"],
+        "dimension": args["dimension"] or "",
+        "date_from": args["date_from"].isoformat(),
+        "date_to": args["date_to"].isoformat(),
+        "agent_id": str(args["agent_id"]) if (args["agent_id"] is not None and current_user.role == "admin") else "",
+    }
+    return render_template(
+        "reports/timeseries.html",
+        data=data,
+        table=money_table(data["totals"], ("revenue", "paid", "profit")),
+        chart=series_json(data),
+        agents=agents,
+        grains=GRAINS,
+        dimensions=DIMENSIONS,
+        filters=filters,
+        is_admin=(current_user.role == "admin"),
+    )
+
+
+@reports_bp.route("/timeseries.json", methods=["GET"])
+@login_required
+def timeseries_json():
+    return jsonify(series_json(build_series(**timeseries_args())))
+
+
+def report_filters():
+    """
+    Filtrat e përbashkët të raporteve nga query string: date_from, date_to, agent_id.
+    Agent => gjithmonë vetëm të vetat; admin => all ose agent_id i zgjedhur.
     """
     date_from = parse_date((request.args.get("date_from") or "").strip())
     date_to = parse_date((request.args.get("date_to") or "").strip())
-    destination = (request.args.get("destination") or "").strip()
-    status = (request.args.get("status") or "").strip()
     selected_agent_id = (request.args.get("agent_id") or "").strip()
 
     # scope
@@ -192,16 +437,37 @@ def outstanding():
         if selected_agent_id.isdigit():
             agent_id = int(selected_agent_id)
 
-    # base query bookings
-    q = Booking.query.filter(func.coalesce(Booking.is_archived, False) == False)  # noqa: E712
+    return {
+        "agent_id": agent_id,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
+
+def outstanding_filters():
+    """
+    Lexon filtrat e raportit Outstanding nga query string (HTML dhe CSV).
+    """
+    return {
+        **report_filters(),
+        "destination": (request.args.get("destination") or "").strip(),
+        "status": (request.args.get("status") or "").strip(),
+    }
+
+
+def outstanding_query(agent_id, date_from, date_to, destination, status):
+    """
+    Bookings me due > 0, filtruar në SQL mbi ledger-in (Booking.due_total).
+    """
+    q = Booking.query.filter(
+        Booking.is_archived == False,  # noqa: E712
+        Booking.due_total > 0,
+    )
 
     if agent_id is not None:
         q = q.filter(Booking.agent_id == agent_id)
 
-    if date_from:
-        q = q.filter(func.date(Booking.created_at) >= date_from)
-    if date_to:
-        q = q.filter(func.date(Booking.created_at) <= date_to)
+    q = q.filter(*datetime_range(Booking.created_at, date_from, date_to))
 
     if destination:
         q = q.filter(Booking.destination.ilike(f"%{destination}%"))
@@ -209,53 +475,302 @@ def outstanding():
     if status:
         q = q.filter(Booking.status == status)
 
-    # Marrim listën dhe filtrojmë due > 0 në Python (sepse paid është relationship)
-    bookings = q.order_by(Booking.created_at.desc()).all()
-
-    rows = []
-    total_due = 0.0
-    total_revenue = 0.0
-    total_paid = 0.0
+    return q
 
-    for b in bookings:
-        paid = float(b.paid_amount() or 0.0)
-        revenue = float(b.total_price or 0.0)
-        due = max(0.0, revenue - paid)
 
-        if due <= 0:
-            continue
+@reports_bp.route("/outstanding", methods=["GET"])
+@login_required
+def outstanding():
+    """
+    Bookings me due > 0
+    - Admin: all agents + filter by agent
+    - Agent: only own
+    Filters: date range (created_at), destination, status
+    Totals me një query agregate; lista me keyset pagination (created_at, id).
+    """
+    filters = outstanding_filters()
+    agent_id = filters["agent_id"]
+    q = outstanding_query(**filters)
+
+    # Totalet në BASE_CURRENCY (kursi i ditës së krijimit të booking-ut), si rollup_totals:
+    # kursi llogaritet një herë për rresht; missing_fx = bookings pa kurs, jashtë shumave
+    rated = q.with_entities(
+        Booking.total_price,
+        Booking.paid_total,
+        Booking.due_total,
+        rate_expr(Booking.currency, Booking.created_at).label("rate"),
+    ).subquery()
+    total_count, total_revenue, total_paid, total_due, missing_fx = db.session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(type_coerce(rated.c.total_price * rated.c.rate, Money)), 0),
+            func.coalesce(func.sum(type_coerce(rated.c.paid_total * rated.c.rate, Money)), 0),
+            func.coalesce(func.sum(type_coerce(rated.c.due_total * rated.c.rate, Money)), 0),
+            func.coalesce(func.sum(case((rated.c.rate.is_(None), 1), else_=0)), 0),
+        )
+    ).one()
+
+    page = keyset_paginate(
+        q.options(joinedload(Booking.client)),
+        Booking.created_at,
+        Booking.id,
+        per_page=get_per_page(),
+        after=decode_cursor(request.args.get("after")),
+        before=decode_cursor(request.args.get("before")),
+    )
 
-        rows.append({
+    rows = [
+        {
             "booking": b,
-            "paid": paid,
-            "due": due,
-            "revenue": revenue,
-        })
+            "paid": b.paid_total,
+            "due": b.due_total,
+            "revenue": money(b.total_price),
+        }
+        for b in page.items
+    ]
+
+    args = request.args.to_dict(flat=True)
+    args.pop("after", None)
+    args.pop("before", None)
 
-        total_due += due
-        total_paid += paid
-        total_revenue += revenue
+    prev_url = url_for("reports.outstanding", **args, before=page.prev_cursor) if page.has_prev else None
+    next_url = url_for("reports.outstanding", **args, after=page.next_cursor) if page.has_next else None
 
     # dropdown agents (admin only)
     agents = []
     if current_user.role == "admin":
         agents = User.query.filter_by(role="agent", is_active=True).order_by(User.full_name.asc()).all()
 
+    date_from = filters["date_from"]
+    date_to = filters["date_to"]
+
     return render_template(
         "reports/outstanding.html",
         rows=rows,
+        total_count=int(total_count or 0),
         total_due=total_due,
         total_paid=total_paid,
         total_revenue=total_revenue,
+        missing_fx=int(missing_fx or 0),
+        prev_url=prev_url,
+        next_url=next_url,
+        export_url=url_for("reports.outstanding_csv", **args),
         agents=agents,
         is_admin=(current_user.role == "admin"),
         selected_agent_id=str(agent_id) if (agent_id is not None and current_user.role == "admin") else "",
         date_from=date_from.isoformat() if date_from else "",
         date_to=date_to.isoformat() if date_to else "",
-        destination=destination,
-        status=status,
+        destination=filters["destination"],
+        status=filters["status"],
         STATUS_CHOICES=[("","all"),("new","new"),("in_progress","in_progress"),("pending_docs","pending_docs"),
                         ("pending_payment","pending_payment"),("confirmed","confirmed"),("ticketed","ticketed"),
                         ("completed","completed"),("canceled","canceled"),("issue","issue"),
                         ("refund_requested","refund_requested"),("refunded","refunded")],
     )
+
+
+@reports_bp.route("/outstanding.csv", methods=["GET"])
+@login_required
+def outstanding_csv():
+    """
+    Të njëjtat filtra si /outstanding, i gjithë rezultati si CSV i streamuar
+    (yield_per, pa e mbajtur listën në memorie).
+    """
+    q = (
+        outstanding_query(**outstanding_filters())
+        .join(Client, Booking.client_id == Client.id)
+        .with_entities(
+            Booking.reference,
+            Client.first_name,
+            Client.last_name,
+            Client.email,
+            Client.phone,
+            Booking.destination,
+            Booking.travel_date,
+            Booking.status,
+            Booking.currency,
+            minor_units(Booking.total_price),
+            minor_units(Booking.paid_total),
+            minor_units(Booking.due_total),
+            minor_units(to_base(Booking.due_total, Booking.currency, Booking.created_at)),
+        )
+        .order_by(Booking.created_at.desc(), Booking.id.desc())
+        .yield_per(1000)
+    )
+
+    # due_base bosh = pa kurs drejt BASE_CURRENCY (si missing_fx te totalet)
+    header = [
+        "reference", "first_name", "last_name", "email", "phone", "destination",
+        "travel_date", "status", "currency", "revenue", "paid", "due", "due_base",
+    ]
+    return csv_response("outstanding.csv", header, q, money=("revenue", "paid", "due", "due_base"))
+
+
+@reports_bp.route("/export/payments.<any(csv, jsonl):fmt>", methods=["GET"])
+@login_required
+def export_payments(fmt):
+    """
+    Payments (jo të arkivuara) sipas paid_at + agent, me booking dhe klientin.
+    Streamohet me yield_per (memorie konstante).
+    """
+    q = (
+        payments_scope_query(**report_filters())
+        .join(Booking, Payment.booking_id == Booking.id)
+        .join(Client, Booking.client_id == Client.id)
+        .with_entities(
+            Payment.receipt_no,
+            Payment.paid_at,
+            Booking.reference,
+            Client.first_name,
+            Client.last_name,
+            Payment.agent_id,
+            Payment.currency,
+            minor_units(Payment.amount),
+            Payment.method,
+            Payment.note,
+        )
+        .order_by(Payment.paid_at.desc(), Payment.id.desc())
+        .yield_per(1000)
+    )
+
+    header = [
+        "receipt_no", "paid_at", "reference", "first_name", "last_name",
+        "agent_id", "currency", "amount", "method", "note",
+    ]
+    return export_response(fmt, "payments", header, q, money=("amount",))
+
+
+@reports_bp.route("/export/clients.<any(csv, jsonl):fmt>", methods=["GET"])
+@login_required
+def export_clients(fmt):
+    """
+    Clients (jo të arkivuar) sipas created_at + agent, opsionalisht q (si lista e klientëve),
+    me numrin e bookings dhe shumat (subquery të korreluara mbi ix_bookings_client_id).
+    """
+    filters = report_filters()
+
+    q = Client.query.filter(Client.is_archived == False)  # noqa: E712
+    if filters["agent_id"] is not None:
+        q = q.filter(Client.agent_id == filters["agent_id"])
+    q = q.filter(*datetime_range(Client.created_at, filters["date_from"], filters["date_to"]))
+
+    term = (request.args.get("q") or "").strip()
+    if term:
+        q = q.filter(client_search_filter(term))
+
+    def client_bookings(*columns):
+        return (
+            select(*columns)
+            .where(Booking.client_id == Client.id, Booking.is_archived == False)  # noqa: E712
+            .correlate(Client)
+            .scalar_subquery()
+        )
+
+    q = (
+        q.with_entities(
+            Client.id,
+            Client.created_at,
+            Client.agent_id,
+            Client.first_name,
+            Client.last_name,
+            Client.email,
+            Client.phone,
+            Client.nationality,
+            client_bookings(func.count(Booking.id)),
+            minor_units(client_bookings(func.coalesce(func.sum(Booking.total_price), 0))),
+            minor_units(client_bookings(func.coalesce(func.sum(Booking.due_total), 0))),
+        )
+        .order_by(Client.created_at.desc(), Client.id.desc())
+        .yield_per(1000)
+    )
+
+    header = [
+        "id", "created_at", "agent_id", "first_name", "last_name", "email", "phone",
+        "nationality", "bookings", "revenue", "due",
+    ]
+    return export_response(fmt, "clients", header, q, money=("revenue", "due"))
+
+
+AUDIT_ENTITY_TYPES = ["Booking", "Client", "Payment", "Document", "User"]
+AUDIT_LIMIT = 200
+
+
+@reports_bp.route("/audit", methods=["GET"])
+@login_required
+def audit_log():
+    """
+    Vetëm admin: log-et sipas entitetit / përdoruesit / periudhës. Tabela kërkohet mbi
+    indekset (entity_type, entity_id, created_at) / (user_id, created_at); me archive=1
+    kërkohen edhe skedarët e `flask logs-archive` (muajt e periudhës, maksimumi
+    LOG_ARCHIVE_SEARCH_MONTHS). booking_id / client_id: historia e plotë e timeline-ve.
+    """
+    require_admin()
+
+    date_from = parse_date((request.args.get("date_from") or "").strip())
+    date_to = parse_date((request.args.get("date_to") or "").strip())
+    entity_type = (request.args.get("entity_type") or "").strip()
+    entity_type = entity_type if entity_type in AUDIT_ENTITY_TYPES else None
+    entity_id = request.args.get("entity_id", type=int)
+    user_id = request.args.get("user_id", type=int)
+    booking_id = request.args.get("booking_id", type=int)
+    client_id = request.args.get("client_id", type=int)
+    include_archive = request.args.get("archive") == "1"
+
+    conditions = list(datetime_range(ActivityLog.created_at, date_from, date_to))
+    if entity_type:
+        conditions.append(ActivityLog.entity_type == entity_type)
+    if entity_id is not None:
+        conditions.append(ActivityLog.entity_id == entity_id)
+    if user_id is not None:
+        conditions.append(ActivityLog.user_id == user_id)
+    if booking_id is not None:
+        conditions.append(ActivityLog.booking_id == booking_id)
+    if client_id is not None:
+        conditions.append(ActivityLog.client_id == client_id)
+
+    rows = [(log, name, False) for log, name in recent_logs(*conditions, limit=AUDIT_LIMIT)]
+
+    archive_from = None  # muaji më i vjetër i kërkuar, kur ka partitione më të vjetra të pakërkuara
+    if include_archive:
+        months = search_months(date_from, date_to)
+        if months and len(archive_months(date_from, date_to)) > len(months):
+            archive_from = months[-1]
+        archived = search_archive(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            user_id=user_id,
+            booking_id=booking_id,
+            client_id=client_id,
+            date_from=date_from,
+            date_to=date_to,
+            limit=AUDIT_LIMIT,
+        )
+        user_ids = {r["user_id"] for r in archived if r["user_id"]}
+        names = dict(db.session.execute(select(User.id, User.full_name).where(User.id.in_(user_ids))).all()) if user_ids else {}
+        rows += [(r, names.get(r["user_id"]), True) for r in archived]
+        rows.sort(key=lambda row: (_log_field(row[0], "created_at") or datetime.min, _log_field(row[0], "id")), reverse=True)
+        rows = rows[:AUDIT_LIMIT]
+
+    users = User.query.order_by(User.full_name.asc()).all()
+
+    return render_template(
+        "reports/audit.html",
+        rows=rows,
+        users=users,
+        entity_types=AUDIT_ENTITY_TYPES,
+        limit=AUDIT_LIMIT,
+        date_from=date_from.isoformat() if date_from else "",
+        date_to=date_to.isoformat() if date_to else "",
+        entity_type=entity_type or "",
+        entity_id=entity_id if entity_id is not None else "",
+        selected_user_id=str(user_id) if user_id is not None else "",
+        booking_id=booking_id,
+        client_id=client_id,
+        include_archive=include_archive,
+        archive_from=archive_from,
+    )
+
+
+def _log_field(log, name):
+    # ActivityLog (tabela) ose dict (arkivi)
+    return log[name] if isinstance(log, dict) else getattr(log, name)
@@ -0,0 +1,177 @@
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+
+from flask import has_request_context
+from flask_login import current_user
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import ActivityLog, User
+
+# ActivityLog pa objekte ORM në transaksionin e request-it:
+# - log_action() vetëm mbledh eventet te session.info (asnjë query)
+# - before_commit: të gjitha eventet e transaksionit -> një INSERT (executemany)
+# - AUDIT_ASYNC=1: pas commit eventet kalojnë te një thread writer (queue), që i
+#   shkruan në batch me lidhjen e vet; commit-i i booking / payment nuk pret audit-in
+# Rollback -> eventet hidhen (veprimi nuk ndodhi).
+# booking_id / client_id lidhin payments / documents me booking-un dhe klientin e tyre,
+# që timeline i një faqeje detail të jetë një query e indeksuar (shih *_timeline).
+
+log = logging.getLogger(__name__)
+
+_EVENTS = "audit_events"
+_COMMITTED = "audit_committed"
+
+TIMELINE_LIMIT = 20
+
+_listening = False
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def log_action(action, entity_type, entity_id=None, meta=None, user_id=None, booking_id=None, client_id=None):
+    """
+    Regjistron një event për commit-in e radhës të db.session; user_id -> current_user.
+    booking_id / client_id: prindërit e entitetit (për Booking / Client merren nga entity_id).
+    """
+    if user_id is None and has_request_context() and current_user.is_authenticated:
+        user_id = current_user.id
+    if entity_type == "Booking" and booking_id is None:
+        booking_id = entity_id
+    if entity_type == "Client" and client_id is None:
+        client_id = entity_id
+
+    db.session.info.setdefault(_EVENTS, []).append(
+        {
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "meta": meta or {},
+            "booking_id": booking_id,
+            "client_id": client_id,
+            "created_at": datetime.utcnow(),
+        }
+    )
+
+
+def recent_logs(*conditions, limit=TIMELINE_LIMIT):
+    # (ActivityLog, emri i përdoruesit), më të rejat së pari; LIMIT mbi indeksin (..., created_at)
+    return db.session.execute(
+        select(ActivityLog, User.full_name)
+        .outerjoin(User, User.id == ActivityLog.user_id)
+        .where(*conditions)
+        .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+        .limit(limit)
+    ).all()
+
+
+def booking_timeline(booking_id, limit=TIMELINE_LIMIT):
+    """Booking-u dhe payments / documents e tij."""
+    return recent_logs(ActivityLog.booking_id == booking_id, limit=limit)
+
+
+def client_timeline(client_id, limit=TIMELINE_LIMIT):
+    """Klienti dhe gjithçka nën bookings e tij."""
+    return recent_logs(ActivityLog.client_id == client_id, limit=limit)
+
+
+def entity_timeline(entity_type, entity_id, limit=TIMELINE_LIMIT):
+    return recent_logs(ActivityLog.entity_type == entity_type, ActivityLog.entity_id == entity_id, limit=limit)
+
+
+def _before_commit(session):
+    events = session.info.pop(_EVENTS, None)
+    if not events:
+        return
+    if _writer is not None:
+        session.info[_COMMITTED] = events  # dërgohen vetëm pasi commit të ketë kaluar
+    else:
+        session.execute(ActivityLog.__table__.insert(), events)
+
+
+def _after_commit(session):
+    events = session.info.pop(_COMMITTED, None)
+    if events:
+        _writer.submit(events)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    if previous_transaction.nested:  # rollback i një savepoint-i, transaksioni vazhdon
+        return
+    session.info.pop(_EVENTS, None)
+    session.info.pop(_COMMITTED, None)
+
+
+class AuditWriter:
+    """Thread daemon që shkruan eventet nga queue në batch (deri në AUDIT_BATCH_SIZE)."""
+
+    def __init__(self, app, maxsize, batch_size):
+        self.app = app
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, events):
+        try:
+            self.queue.put_nowait(events)
+        except queue.Full:
+            # writer-i mbetet pas: shkruajmë direkt, më mirë vonesë se humbje
+            log.warning("audit queue full, writing %d events inline", len(events))
+            self._write(events)
+
+    def _run(self):
+        while True:
+            events = self.queue.get()
+            if events is None:
+                return
+            batch = list(events)
+            while len(batch) < self.batch_size:
+                try:
+                    more = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._write(batch)
+                    return
+                batch.extend(more)
+            self._write(batch)
+
+    def _write(self, events):
+        try:
+            with self.app.app_context(), db.engine.begin() as conn:
+                conn.execute(ActivityLog.__table__.insert(), events)
+        except Exception:
+            log.exception("audit writer dropped %d events", len(events))
+
+    def stop(self, timeout=5):
+        """Shkruan çfarë ka mbetur në queue (atexit)."""
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+
+def init_audit(app):
+    """
+    Lidh log_action me commit-in e sesionit; AUDIT_ASYNC=True nis writer-in në background.
+    """
+    global _listening, _writer
+    if not _listening:
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+        _listening = True
+
+    if app.config.get("AUDIT_ASYNC"):
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    app,
+                    maxsize=app.config.get("AUDIT_QUEUE_SIZE", 10000),
+                    batch_size=app.config.get("AUDIT_BATCH_SIZE", 500),
+                )
+                atexit.register(_writer.stop)
@@ -0,0 +1,145 @@
+import threading
+import time
+from datetime import datetime
+
+from flask import g, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import CacheVersion
+
+
+class TTLCache:
+    """
+    Cache i thjeshtë në proces me TTL (për çdo worker). Përdoret për vlera të
+    lexuara shpesh dhe të lira për t'u rillogaritur (p.sh. KPI e dashboard).
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_set(self, key, ttl, factory):
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            if ttl > 0:
+                self.set(key, value, ttl)
+        return value
+
+
+dashboard_cache = TTLCache()
+count_cache = TTLCache()  # COUNT(*) për listat me keyset pagination
+timeseries_cache = TTLCache()  # bucket-et e mbyllura të utils/timeseries
+
+
+def cache_version(name):
+    """
+    Versioni i grupit `name` (tabela cache_versions), pjesë e çelësave të cache-ve në proces:
+    bump_version() në një worker / CLI i bën të paarritshme vlerat e vjetra në të gjithë workers.
+    Lexohet një herë për app context (request) për të gjitha grupet.
+    """
+    versions = g.get("cache_versions") if has_app_context() else None
+    if versions is None:
+        versions = dict(db.session.execute(select(CacheVersion.name, CacheVersion.version)).all())
+        if has_app_context():
+            g.cache_versions = versions
+    return versions.get(name, 0)
+
+
+def bump_version(name, session=None):
+    """Brenda transaksionit që ndryshon të dhënat: versioni i ri duket vetëm pas commit."""
+    session = session or db.session
+    insert_ = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    table = CacheVersion.__table__
+    stmt = insert_(table).values(name=name, version=1)
+    session.execute(
+        stmt.on_conflict_do_update(index_elements=[table.c.name], set_={"version": table.c.version + 1})
+    )
+    if has_app_context():
+        g.pop("cache_versions", None)
+
+
+def dashboard_scope(user):
+    """Admin sheh gjithçka ("all"), agjenti vetëm të vetat (agent_id)."""
+    return "all" if user.role == "admin" else user.id
+
+
+def invalidate_dashboard(*agent_ids):
+    """
+    Thirret pas commit të bookings/payments/clients: fshin scope e agjentëve
+    të prekur + scope "all" të adminit.
+    """
+    dashboard_cache.delete("all", *agent_ids)
+
+
+_TIMESERIES_DIRTY = "timeseries_dirty"
+_TIMESERIES_BUMPED = "timeseries_bumped"
+
+_listening = False
+
+
+def invalidate_timeseries(*days):
+    """
+    Thirret kur ndryshojnë totalet e ditëve `days` (rollups), brenda transaksionit: një ditë
+    para sotme mund të jetë në një bucket të mbyllur të cache-uar. Pa `days` -> gjithmonë.
+    Versioni "timeseries" rritet në commit (before_commit), jo tani: deri sa të dhënat
+    të jenë të dukshme, çelësi i vjetër mbetet i vlefshëm.
+    """
+    today = datetime.utcnow().date()
+    if not days or any(day < today for day in days):
+        db.session.info[_TIMESERIES_DIRTY] = True
+
+
+def _before_commit(session):
+    if session.info.pop(_TIMESERIES_DIRTY, None):
+        # i njëjti transaksion me të dhënat: versioni i ri duket bashkë me to, në çdo worker
+        bump_version("timeseries", session)
+        session.info[_TIMESERIES_BUMPED] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_TIMESERIES_BUMPED, None):
+        timeseries_cache.clear()  # vlerat me versionin e vjetër nuk lexohen më; lirojmë memorien
+
+
+def _after_soft_rollback(session, previous_transaction):
+    if previous_transaction.nested:
+        return
+    session.info.pop(_TIMESERIES_DIRTY, None)
+    session.info.pop(_TIMESERIES_BUMPED, None)
+
+
+def init_cache(app):
+    global _listening
+    if not _listening:
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+        _listening = True
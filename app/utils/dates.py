@@ -0,0 +1,100 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Date
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+def datetime_range(column, date_from: date | None, date_to: date | None):
+    """
+    Filtra sargable për një kolonë DateTime: [date_from 00:00, date_to + 1 ditë 00:00).
+    Krahasim direkt me kolonën (pa func.date), që indeksi të përdoret.
+    """
+    conds = []
+    if date_from:
+        conds.append(column >= datetime.combine(date_from, time.min))
+    if date_to:
+        conds.append(column < datetime.combine(date_to + timedelta(days=1), time.min))
+    return conds
+
+
+# =========================
+# Bucket-e kohore (raportet time-series)
+# =========================
+GRAINS = ("day", "week", "month")
+
+
+class date_bucket(FunctionElement):
+    """
+    Fillimi i bucket-it (Date) për një kolonë Date/DateTime, njësoj në SQLite dhe PostgreSQL.
+    Java fillon të hënën (si date_trunc('week') në PostgreSQL).
+    Përdoret përmes bucket_expr(grain, column).
+    """
+
+    type = Date()
+    inherit_cache = True
+    grain = None
+
+
+class day_bucket(date_bucket):
+    grain = "day"
+    inherit_cache = True
+
+
+class week_bucket(date_bucket):
+    grain = "week"
+    inherit_cache = True
+
+
+class month_bucket(date_bucket):
+    grain = "month"
+    inherit_cache = True
+
+
+_BUCKETS = {b.grain: b for b in (day_bucket, week_bucket, month_bucket)}
+
+# SQLite: date(x, modifiers...); 'weekday 0' shkon te e diela e radhës (ose mbetet), -6 ditë -> e hëna
+_SQLITE_MODIFIERS = {"day": "", "week": ", 'weekday 0', '-6 days'", "month": ", 'start of month'"}
+
+
+@compiles(date_bucket)
+def _compile_bucket(element, compiler, **kw):
+    (column,) = element.clauses
+    return f"date({compiler.process(column, **kw)}{_SQLITE_MODIFIERS[element.grain]})"
+
+
+@compiles(date_bucket, "postgresql")
+def _compile_bucket_pg(element, compiler, **kw):
+    (column,) = element.clauses
+    return f"CAST(date_trunc('{element.grain}', CAST({compiler.process(column, **kw)} AS TIMESTAMP)) AS DATE)"
+
+
+def bucket_expr(grain, column):
+    return _BUCKETS[grain](column)
+
+
+def bucket_start(day: date, grain):
+    """Njësoj si bucket_expr, në Python."""
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start: date, grain):
+    if grain == "week":
+        return start + timedelta(days=7)
+    if grain == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def bucket_starts(date_from: date, date_to: date, grain):
+    """Të gjitha bucket-et që prekin [date_from, date_to], me radhë."""
+    starts = []
+    current = bucket_start(date_from, grain)
+    while current <= date_to:
+        starts.append(current)
+        current = next_bucket(current, grain)
+    return starts
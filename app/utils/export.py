@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+
+from flask import Response, stream_with_context
+
+from .money import from_minor_many
+
+FLUSH_BYTES = 64 * 1024
+MONEY_BATCH = 1000  # = yield_per i query-ve të export-it
+
+
+def csv_stream(header, rows):
+    """
+    Gjeneron CSV në copa ~64 KB; rows është iterator (p.sh. query me yield_per),
+    kështu memoria mbetet e njëjtë pavarësisht numrit të rreshtave.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= FLUSH_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    yield buf.getvalue()
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)  # Money: 2 shifra, float i saktë për JSON
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def jsonl_stream(header, rows):
+    """
+    JSON Lines: një objekt {header: vlerë} për rresht, në copa ~64 KB si csv_stream.
+    """
+    buf = io.StringIO()
+
+    for row in rows:
+        buf.write(json.dumps(dict(zip(header, row)), default=_json_default, ensure_ascii=False))
+        buf.write("\n")
+        if buf.tell() >= FLUSH_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+
+    yield buf.getvalue()
+
+
+def money_rows(header, rows, columns):
+    """
+    Rreshtat ku kolonat `columns` (emra nga header) vijnë si centë (money.minor_units):
+    konvertohen në Decimal një kolonë e tërë për batch (from_minor_many), jo vlerë për vlerë.
+    """
+    positions = [header.index(c) for c in columns]
+    rows = iter(rows)
+    while True:
+        batch = [list(row) for row in islice(rows, MONEY_BATCH)]
+        if not batch:
+            return
+        for i in positions:
+            for row, value in zip(batch, from_minor_many([row[i] for row in batch])):
+                row[i] = value
+        yield from batch
+
+
+EXPORT_FORMATS = {
+    # fmt -> (mimetype, generator)
+    "csv": ("text/csv", csv_stream),
+    "jsonl": ("application/x-ndjson", jsonl_stream),
+}
+
+
+def export_response(fmt, name, header, rows, money=()):
+    """
+    Response i streamuar në formatin fmt (csv | jsonl); filename = name.fmt.
+    money: kolonat e zgjedhura si centë, shih money_rows.
+    """
+    mimetype, stream = EXPORT_FORMATS[fmt]
+    if money:
+        rows = money_rows(header, rows, money)
+    return Response(
+        stream_with_context(stream(header, rows)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+def csv_response(filename, header, rows, money=()):
+    name, _, _ = filename.rpartition(".")
+    return export_response("csv", name or filename, header, rows, money)
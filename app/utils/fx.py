@@ -0,0 +1,118 @@
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import case, select, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..extensions import db
+from ..models import FxRate
+from .cache import TTLCache, bump_version, cache_version
+from .money import Money, money
+
+# Kurset ditore drejt BASE_CURRENCY (tabela fx_rates, `flask fx-load rates.csv`).
+# - rate_expr() / to_base(): kursi si subquery e korreluar, që raportet të konvertojnë
+#   brenda SQL (SUM(amount * rate)), mbi PK (currency, day) -> një seek për rresht
+# - get_rate() / convert(): lookup në Python me cache në proces (FX_CACHE_TTL), me çelës që
+#   përfshin cache_version("fx"): load_rates() e rrit, ndaj kurset e reja duken në çdo worker
+# Dita pa kurs merr kursin e fundit para saj; pa asnjë kurs -> NULL (nuk hyn në shuma).
+
+fx_cache = TTLCache()
+
+CSV_COLUMNS = ("date", "currency", "rate")
+
+
+def base_currency():
+    return current_app.config.get("BASE_CURRENCY", "EUR")
+
+
+def rate_expr(currency_col, day_col):
+    """
+    Shprehje SQL: kursi i `currency_col` në ditën `day_col` (Date ose DateTime).
+    Monedha bazë (ose NULL, si te rollups) -> 1.
+    """
+    latest = (
+        select(FxRate.rate)
+        .where(FxRate.currency == currency_col, FxRate.day <= day_col)
+        .order_by(FxRate.day.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return case(
+        (currency_col.is_(None), 1.0),
+        (currency_col == base_currency(), 1.0),
+        else_=latest,
+    )
+
+
+def to_base(amount_col, currency_col, day_col):
+    """amount * kursi, si Money (centë -> Decimal) që SUM(...) të lexohet si para."""
+    return type_coerce(amount_col * rate_expr(currency_col, day_col), Money)
+
+
+def get_rate(currency, day):
+    """Kursi (float) ose None nëse nuk ka kurs deri në atë ditë."""
+    if not currency or currency == base_currency():
+        return 1.0
+
+    def lookup():
+        return db.session.scalar(
+            select(FxRate.rate)
+            .where(FxRate.currency == currency, FxRate.day <= day)
+            .order_by(FxRate.day.desc())
+            .limit(1)
+        )
+
+    key = (currency, day, cache_version("fx"))
+    return fx_cache.get_or_set(key, current_app.config.get("FX_CACHE_TTL", 0), lookup)
+
+
+def convert(amount, currency, day):
+    rate = get_rate(currency, day)
+    return None if rate is None else money(money(amount) * Decimal(repr(rate)))
+
+
+def read_rates(stream):
+    """
+    CSV (date,currency,rate; date = YYYY-MM-DD) nga një stream binar -> list me dict.
+    ValueError me numrin e rreshtit për vlera të pavlefshme.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    missing = [c for c in CSV_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    rows = []
+    for line, raw in enumerate(reader, start=2):
+        try:
+            rate = float(raw["rate"])
+            if rate <= 0:
+                raise ValueError("rate must be > 0")
+            rows.append({
+                "day": datetime.strptime(raw["date"].strip(), "%Y-%m-%d").date(),
+                "currency": raw["currency"].strip().upper(),
+                "rate": rate,
+            })
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"line {line}: {e}")
+    return rows
+
+
+def load_rates(rows):
+    """Upsert sipas (currency, day); kursi ekzistues mbishkruhet. Kthen numrin e rreshtave."""
+    if not rows:
+        return 0
+
+    insert_ = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    table = FxRate.__table__
+    stmt = insert_(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.currency, table.c.day],
+        set_={"rate": stmt.excluded.rate},
+    )
+    db.session.execute(stmt, rows)
+    bump_version("fx")
+    fx_cache.clear()
+    return len(rows)
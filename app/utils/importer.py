@@ -0,0 +1,313 @@
+import csv
+import io
+from datetime import date, datetime
+
+from sqlalchemy import insert, select, tuple_, update
+
+from ..bookings.forms import BOOKING_TYPE_CHOICES, CURRENCY_CHOICES, STATUS_CHOICES
+from ..extensions import db
+from ..models import Booking, Client
+from .audit import log_action
+from .cache import count_cache, invalidate_dashboard
+from .money import ZERO, parse_money
+from .reference import reserve_booking_references
+from .rollups import record_bookings
+from .search import index_bookings, index_clients
+
+# Import masiv (CSV / XLSX) i klientëve + bookings, me të njëjtat rregulla si bookings.create:
+# - klienti gjendet sipas EMAIL + PHONE (jo i arkivuar), përndryshe krijohet
+# - rreshtat futen në batch (executemany / INSERT ... RETURNING), jo një nga një
+# - referencat rezervohen në bllok nga sequences, një ActivityLog për batch
+# Çdo batch bëhet commit më vete: një gabim DB ndal importin, batch-et e mëparshme mbeten.
+# Kolonat e skedarit kanë emrat e fushave të BookingCreateForm (shih IMPORT_COLUMNS).
+
+BATCH_SIZE = 1000
+
+CLIENT_COLUMNS = {
+    # kolona -> (required, max length)
+    "first_name": (True, 100),
+    "last_name": (True, 100),
+    "email": (True, 180),
+    "phone": (True, 50),
+    "passport_no": (False, 80),
+    "nationality": (False, 80),
+    "address": (False, 255),
+    "client_notes": (False, None),
+}
+CLIENT_DATES = ("birth_date", "passport_expiry")
+
+BOOKING_COLUMNS = {
+    "destination": (True, 120),
+    "departure_city": (False, 120),
+    "hotel_name": (False, 150),
+    "flight_numbers": (False, 255),
+    "pnr": (False, 50),
+}
+BOOKING_DATES = ("travel_date", "return_date")
+BOOKING_INTS = {"num_pax": 1, "adults": 1, "children": 0}
+BOOKING_AMOUNTS = ("total_price", "discount", "service_fee", "extras_total", "internal_cost")
+
+IMPORT_COLUMNS = (
+    list(CLIENT_COLUMNS) + list(CLIENT_DATES)
+    + ["booking_type", "status", "currency"]
+    + list(BOOKING_COLUMNS) + list(BOOKING_DATES) + list(BOOKING_INTS) + list(BOOKING_AMOUNTS)
+)
+
+STATUSES = {v for v, _ in STATUS_CHOICES}
+CURRENCIES = {v for v, _ in CURRENCY_CHOICES}
+BOOKING_TYPES = {v for v, _ in BOOKING_TYPE_CHOICES}
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.bookings = 0
+        self.created_ids = set()
+        self.updated_ids = set()
+        self.errors = []  # (rreshti në skedar, mesazhi)
+
+    @property
+    def clients_created(self):
+        return len(self.created_ids)
+
+    @property
+    def clients_updated(self):
+        # klientë ekzistues (jo të krijuar nga ky import) të përditësuar
+        return len(self.updated_ids - self.created_ids)
+
+    @property
+    def skipped(self):
+        return len(self.errors)
+
+
+# -------------------------
+# Leximi i skedarit
+# -------------------------
+def read_rows(stream, filename):
+    """
+    Iterator me dict (header -> vlerë) nga një stream binar; .xlsx me openpyxl
+    (requirements.txt), çdo gjë tjetër si CSV UTF-8. Skedari nuk lexohet i gjithi në memorie.
+    """
+    if filename.lower().endswith(".xlsx"):
+        return _xlsx_rows(stream)
+    return csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+
+
+def _xlsx_rows(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires openpyxl (pip install openpyxl); upload a CSV instead.")
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+
+    def rows():
+        values = wb.active.iter_rows(values_only=True)
+        header = [_text(h) for h in next(values, ())]
+        for row in values:
+            if any(v not in (None, "") for v in row):
+                yield dict(zip(header, row))
+        wb.close()
+
+    return rows()
+
+
+# -------------------------
+# Validimi i një rreshti
+# -------------------------
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # XLSX: telefonat vijnë si numra
+    return str(value).strip()
+
+
+def _date(raw, name):
+    value = raw.get(name)
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"{name}: expected YYYY-MM-DD, got {value!r}")
+
+
+def _number(raw, name, cast, default):
+    value = _text(raw.get(name))
+    if not value:
+        return default
+    try:
+        number = cast(value)
+    except ValueError:
+        raise ValueError(f"{name}: not a number ({value!r})")
+    if number < 0:
+        raise ValueError(f"{name}: must be >= 0")
+    return number
+
+
+def _strings(raw, columns):
+    out = {}
+    for name, (required, max_len) in columns.items():
+        value = _text(raw.get(name))
+        if required and not value:
+            raise ValueError(f"{name} is required")
+        if max_len and len(value) > max_len:
+            raise ValueError(f"{name}: longer than {max_len} characters")
+        out[name] = value or None
+    return out
+
+
+def _choice(raw, name, allowed, default):
+    value = _text(raw.get(name)) or default
+    if value not in allowed:
+        raise ValueError(f"{name}: invalid value {value!r}")
+    return value
+
+
+def parse_row(raw):
+    """
+    Një rresht i skedarit -> (client, booking) si dict me kolonat e modeleve.
+    ValueError me mesazh për rreshtat e pavlefshëm.
+    """
+    raw = {_text(k).lower(): v for k, v in raw.items() if k is not None}
+
+    client = _strings(raw, CLIENT_COLUMNS)
+    client["notes"] = client.pop("client_notes")
+    for name in CLIENT_DATES:
+        client[name] = _date(raw, name)
+
+    booking = _strings(raw, BOOKING_COLUMNS)
+    for name in BOOKING_DATES:
+        booking[name] = _date(raw, name)
+    for name, default in BOOKING_INTS.items():
+        booking[name] = _number(raw, name, int, default)
+    for name in BOOKING_AMOUNTS:
+        booking[name] = _number(raw, name, parse_money, ZERO)
+
+    booking["booking_type"] = _choice(raw, "booking_type", BOOKING_TYPES, "combined")
+    booking["status"] = _choice(raw, "status", STATUSES, "new")
+    booking["currency"] = _choice(raw, "currency", CURRENCIES, "EUR")
+
+    return client, booking
+
+
+# -------------------------
+# Importi
+# -------------------------
+def import_bookings(rows, agent_id, user_id=None, batch_size=BATCH_SIZE, source=None):
+    """
+    Importon rows (nga read_rows) për agjentin agent_id. Rreshtat e pavlefshëm
+    anashkalohen dhe raportohen te result.errors; commit pas çdo batch.
+    """
+    result = ImportResult()
+    clients = {}  # (email, phone) -> client id, për gjithë importin
+    batch = []
+
+    for line, raw in enumerate(rows, start=2):  # rreshti 1 = header
+        result.rows += 1
+        try:
+            batch.append(parse_row(raw))
+        except ValueError as e:
+            result.errors.append((line, str(e)))
+            continue
+
+        if len(batch) >= batch_size:
+            _import_batch(batch, clients, agent_id, user_id, source, result)
+            batch = []
+
+    if batch:
+        _import_batch(batch, clients, agent_id, user_id, source, result)
+
+    if result.bookings:
+        invalidate_dashboard(agent_id)
+        count_cache.clear()
+    return result
+
+
+def _import_batch(batch, clients, agent_id, user_id, source, result):
+    # Klientët: i fundit në batch fiton (si create(), që mbishkruan të dhënat e klientit)
+    latest = {}
+    for client, _ in batch:
+        latest[(client["email"], client["phone"])] = client
+
+    # Një query për çelësat që nuk janë ende në indeks
+    unknown = [key for key in latest if key not in clients]
+    if unknown:
+        found = db.session.execute(
+            select(Client.id, Client.email, Client.phone).where(
+                tuple_(Client.email, Client.phone).in_(unknown),
+                Client.is_archived == False,  # noqa: E712
+            ).order_by(Client.id)
+        )
+        for client_id, email, phone in found:
+            clients.setdefault((email, phone), client_id)
+
+    new = [(key, c) for key, c in latest.items() if key not in clients]
+    existing = [{"id": clients[key], **c} for key, c in latest.items() if key in clients]
+
+    if new:
+        ids = db.session.scalars(
+            insert(Client).returning(Client.id, sort_by_parameter_order=True),
+            [{**c, "agent_id": agent_id, "tags": []} for _, c in new],
+        ).all()
+        for (key, _), client_id in zip(new, ids):
+            clients[key] = client_id
+
+    if existing:
+        # ORM bulk UPDATE sipas primary key (executemany)
+        db.session.execute(update(Client), existing)
+
+    index_clients([{"id": clients[key], **c} for key, c in latest.items()])
+
+    # Bookings: referenca në bllok, pa paguar -> due = total
+    references = reserve_booking_references(len(batch))
+    now = datetime.utcnow()
+    values = [
+        {
+            **b,
+            "reference": ref,
+            "agent_id": agent_id,
+            "client_id": clients[(c["email"], c["phone"])],
+            "paid_total": ZERO,
+            "due_total": b["total_price"],
+            "payments_count": 0,
+            "created_at": now,
+        }
+        for (c, b), ref in zip(batch, references)
+    ]
+    ids = db.session.scalars(
+        insert(Booking).returning(Booking.id, sort_by_parameter_order=True),
+        values,
+    ).all()
+
+    record_bookings(values)
+    index_bookings([{"id": booking_id, "reference": v["reference"]} for booking_id, v in zip(ids, values)])
+
+    result.batches += 1
+    result.bookings += len(values)
+    result.created_ids.update(clients[key] for key, _ in new)
+    result.updated_ids.update(c["id"] for c in existing)
+
+    log_action(
+        "Bookings imported",
+        "Booking",
+        meta={
+            "source": source,
+            "batch": result.batches,
+            "agent_id": agent_id,
+            "bookings": len(values),
+            "clients_created": len(new),
+            "clients_updated": len(existing),
+            "first_reference": references[0],
+            "last_reference": references[-1],
+        },
+        user_id=user_id,
+    )
+    db.session.commit()
@@ -0,0 +1,31 @@
+from sqlalchemy import func, select, update
+
+from ..extensions import db
+from ..models import Booking, Payment, due_expr
+
+
+def rebuild_ledgers():
+    """
+    Rillogarit Booking.paid_total / due_total / payments_count nga tabela payments
+    (vetëm pagesat jo të arkivuara). Një UPDATE i vetëm me subquery të korreluara.
+    Kthen numrin e bookings të prekura.
+    """
+    active = Payment.is_archived == False  # noqa: E712
+
+    paid = (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.booking_id == Booking.id, active)
+        .scalar_subquery()
+    )
+    count = (
+        select(func.count(Payment.id))
+        .where(Payment.booking_id == Booking.id, active)
+        .scalar_subquery()
+    )
+
+    result = db.session.execute(
+        update(Booking)
+        .values(paid_total=paid, payments_count=count, due_total=due_expr(Booking.total_price, paid))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
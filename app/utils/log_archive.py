@@ -0,0 +1,164 @@
+import gzip
+import heapq
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, select, text
+
+from ..extensions import db
+from ..models import ActivityLog
+
+# Retention për activity_logs (`flask logs-archive`):
+# - rreshtat më të vjetër se LOG_RETENTION_MONTHS (muaj kalendarikë të plotë) kalojnë te
+#   LOG_ARCHIVE_FOLDER/YYYY-MM/<id_parë>-<id_fundit>.jsonl.gz, pastaj fshihen nga tabela
+# - batch-e sipas id (PK), një commit për batch: transaksione të shkurtra, pa lock të gjatë
+# - skedari shkruhet (temp + os.replace) para DELETE; një ndërprerje mes tyre jep dublikata
+#   në arkiv, që leximi (search_archive) i heq sipas id
+# Arkivi lexohet nga /reports/audit (admin) me "Include archive": vetëm muajt e periudhës,
+# maksimumi LOG_ARCHIVE_SEARCH_MONTHS më të rinjtë, që një kërkim pa datë të mos lexojë gjithë arkivin.
+
+BATCH_SIZE = 5000
+
+FIELDS = ("id", "user_id", "action", "entity_type", "entity_id", "booking_id", "client_id", "meta", "created_at")
+
+
+def archive_root():
+    return current_app.config.get("LOG_ARCHIVE_FOLDER", "log_archive")
+
+
+def retention_cutoff(months, today=None):
+    """Fillimi i muajit `months` muaj para atij aktual (partitionet mbeten muaj të plotë)."""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def archive_logs(months, batch_size=BATCH_SIZE, dry_run=False, pause=0.0):
+    """Kthen dict me rreshtat, batch-et dhe skedarët e shkruar."""
+    cutoff = retention_cutoff(months)
+    old = ActivityLog.created_at < cutoff
+    stats = {"cutoff": cutoff, "rows": 0, "batches": 0, "files": 0}
+
+    if dry_run:
+        stats["rows"] = db.session.scalar(select(func.count(ActivityLog.id)).where(old))
+        return stats
+
+    table = ActivityLog.__table__
+    cols = [table.c[name] for name in FIELDS]
+    while True:
+        # rreshtat e vjetër kanë id të ulëta: skanimi sipas PK ndalon shpejt te LIMIT
+        rows = db.session.execute(select(*cols).where(old).order_by(table.c.id).limit(batch_size)).all()
+        if not rows:
+            break
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row.created_at.strftime("%Y-%m"), []).append(row)
+        for month, month_rows in by_month.items():
+            _write_partition(month, month_rows)
+            stats["files"] += 1
+
+        db.session.execute(delete(ActivityLog).where(ActivityLog.id.in_([r.id for r in rows])))
+        db.session.commit()
+
+        stats["rows"] += len(rows)
+        stats["batches"] += 1
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)  # lë vend për shkrimet e request-eve
+
+    return stats
+
+
+def _write_partition(month, rows):
+    folder = os.path.join(archive_root(), month)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{rows[0].id:010d}-{rows[-1].id:010d}.jsonl.gz")
+
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    with os.fdopen(fd, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as out:
+            for row in rows:
+                record = dict(row._mapping)
+                record["created_at"] = record["created_at"].isoformat()
+                out.write(json.dumps(record, ensure_ascii=False, default=str).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+
+
+def compact():
+    """Liron hapësirën pas archive (VACUUM jashtë transaksionit)."""
+    engine = db.engine
+    statement = "VACUUM ANALYZE activity_logs" if engine.dialect.name == "postgresql" else "VACUUM"
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(statement))
+
+
+def archive_months(date_from=None, date_to=None):
+    """Partitionet (YYYY-MM) që prekin periudhën, më të rinjtë së pari."""
+    root = archive_root()
+    if not os.path.isdir(root):
+        return []
+    first = date_from.strftime("%Y-%m") if date_from else ""
+    last = date_to.strftime("%Y-%m") if date_to else "9999-99"
+    return sorted(
+        (name for name in os.listdir(root) if len(name) == 7 and first <= name <= last),
+        reverse=True,
+    )
+
+
+def search_months(date_from=None, date_to=None):
+    """archive_months e kufizuar në LOG_ARCHIVE_SEARCH_MONTHS."""
+    return archive_months(date_from, date_to)[:current_app.config.get("LOG_ARCHIVE_SEARCH_MONTHS", 6)]
+
+
+def iter_archive(months):
+    """Rreshtat e arkivuar (dict) të partitioneve `months`; lexon vetëm ato."""
+    root = archive_root()
+    for month in months:
+        folder = os.path.join(root, month)
+        for name in sorted(os.listdir(folder), reverse=True):
+            if not name.endswith(".jsonl.gz"):
+                continue
+            with gzip.open(os.path.join(folder, name), "rt", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    record["created_at"] = datetime.fromisoformat(record["created_at"])
+                    yield record
+
+
+def search_archive(entity_type=None, entity_id=None, user_id=None, booking_id=None, client_id=None,
+                   date_from=None, date_to=None, limit=200):
+    """
+    Filtrat si te tabela (datetime_range: [date_from, date_to + 1 ditë)), mbi search_months;
+    kthen më të rejat së pari, maksimumi `limit`, pa dublikata.
+    """
+    start = datetime.combine(date_from, dtime.min) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), dtime.min) if date_to else None
+    wanted = {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "user_id": user_id,
+        "booking_id": booking_id,
+        "client_id": client_id,
+    }
+    wanted = {k: v for k, v in wanted.items() if v is not None}
+
+    def matches(r):
+        return (
+            all(r.get(k) == v for k, v in wanted.items())
+            and (start is None or r["created_at"] >= start)
+            and (end is None or r["created_at"] < end)
+        )
+
+    found = {}
+    for record in iter_archive(search_months(date_from, date_to)):
+        if matches(record):
+            found[record["id"]] = record
+    return heapq.nlargest(limit, found.values(), key=lambda r: (r["created_at"], r["id"]))
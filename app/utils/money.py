@@ -0,0 +1,107 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from sqlalchemy import BigInteger, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+# Shumat e parave ruhen si numër i plotë në njësi të vogla (centë): 12.34 EUR -> 1234.
+# - në DB: BIGINT, që SUM / + / - të jenë të sakta (pa drift si Float)
+# - në Python: Decimal me 2 shifra (Money i konverton në të dy drejtimet)
+# Të gjitha monedhat e SUPPORTED_CURRENCIES kanë 2 shifra dhjetore.
+
+MINOR_UNITS = 100
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+def money(value):
+    """Decimal me 2 shifra (None -> 0.00); float kalon nga str, pa gabimet binare."""
+    if value is None:
+        return ZERO
+    if isinstance(value, float):
+        value = repr(value)
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def parse_money(text):
+    """Tekst (CSV / input) -> Decimal; ValueError për vlera jo numerike."""
+    try:
+        value = money(str(text).strip().replace(",", ""))
+    except InvalidOperation:
+        raise ValueError(f"not a number ({text!r})")
+    if not value.is_finite():
+        raise ValueError(f"not a number ({text!r})")
+    return value
+
+
+def to_minor(value):
+    """12.34 -> 1234 (None mbetet None)."""
+    if value is None:
+        return None
+    return int(money(value) * MINOR_UNITS)
+
+
+def from_minor(value):
+    """
+    1234 -> Decimal("12.34"). Pranon edhe Decimal (SUM në PostgreSQL) dhe float
+    (shuma të konvertuara me kurs, utils/fx.to_base), që rrumbullakohen në cent.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        value = repr(value)
+    return (Decimal(value) / MINOR_UNITS).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def to_minor_many(values):
+    """Konvertim në bllok (executemany / import): list me int ose None."""
+    return [to_minor(v) for v in values]
+
+
+def from_minor_many(values):
+    """
+    from_minor për një kolonë të tërë (export-et, batch pas batch-i). Centët e plotë
+    (int, Decimal nga SUM në PostgreSQL) kalojnë me scaleb(-2), pa quantize; float-et
+    (shuma me kurs) rrumbullakohen si te from_minor.
+    """
+    out = []
+    for v in values:
+        if isinstance(v, int) or (isinstance(v, Decimal) and v.as_tuple().exponent == 0):
+            out.append(Decimal(v).scaleb(-2))
+        else:
+            out.append(from_minor(v))
+    return out
+
+
+def minor_units(expr):
+    """Kolonë / shprehje Money e lexuar si centë (BIGINT), pa konvertimin e Money për çdo vlerë."""
+    return type_coerce(expr, BigInteger)
+
+
+def format_money(value, currency=None):
+    """1234.5 -> "1,234.50" (ose "1,234.50 EUR"); filtri Jinja `money`."""
+    text = f"{money(value):,.2f}"
+    return f"{text} {currency}" if currency else text
+
+
+def format_many(values, currency=None):
+    return [format_money(v, currency) for v in values]
+
+
+class Money(TypeDecorator):
+    """Kolonë parash: Decimal në Python, BIGINT (centë) në DB."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_minor(value)
+
+    def process_literal_param(self, value, dialect):
+        return str(to_minor(value))
+
+    def process_result_value(self, value, dialect):
+        return from_minor(value)
+
+    @property
+    def python_type(self):
+        return Decimal
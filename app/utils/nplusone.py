@@ -0,0 +1,63 @@
+import logging
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_listening = False
+
+
+class LazyLoadError(RuntimeError):
+    """Më shumë lazy loads në një request se LAZY_LOAD_THRESHOLD (me LAZY_LOAD_RAISE)."""
+
+
+def _enabled():
+    return current_app.config.get("LAZY_LOAD_DETECTOR") or current_app.testing
+
+
+def _on_orm_execute(state):
+    # Vetëm lazy loads (jo selectinload/joinedload), vetëm brenda një request
+    if not state.is_select or state.lazy_loaded_from is None:
+        return
+    if not has_request_context() or not _enabled():
+        return
+
+    loads = g.setdefault("lazy_loads", Counter())
+    parent = state.lazy_loaded_from.class_.__name__
+    target = state.bind_mapper.class_.__name__ if state.bind_mapper else "?"
+    loads[f"{parent} -> {target}"] += 1
+
+    threshold = current_app.config.get("LAZY_LOAD_THRESHOLD", 5)
+    if current_app.config.get("LAZY_LOAD_RAISE") and sum(loads.values()) > threshold:
+        raise LazyLoadError(
+            f"{request.method} {request.path}: {sum(loads.values())} lazy loads "
+            f"(threshold {threshold}): {dict(loads)}"
+        )
+
+
+def _report(response):
+    loads = g.pop("lazy_loads", None)
+    if loads:
+        total = sum(loads.values())
+        if total > current_app.config.get("LAZY_LOAD_THRESHOLD", 5):
+            logger.warning(
+                "N+1 suspect: %s %s made %d lazy loads: %s",
+                request.method, request.path, total, dict(loads),
+            )
+    return response
+
+
+def init_nplusone(app):
+    """
+    Numëron lazy loads për request (debug / testing, ose LAZY_LOAD_DETECTOR=True).
+    Mbi LAZY_LOAD_THRESHOLD: log warning, ose LazyLoadError nëse LAZY_LOAD_RAISE.
+    """
+    global _listening
+    if not _listening:
+        event.listen(Session, "do_orm_execute", _on_orm_execute)
+        _listening = True
+
+    app.after_request(_report)
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import tuple_
+
+
+def get_per_page(default=None):
+    """
+    per_page nga query string, brenda DEFAULT_PAGE_SIZE / MAX_PAGE_SIZE të Config.
+    """
+    per_page = request.args.get("per_page", type=int) or default or current_app.config["DEFAULT_PAGE_SIZE"]
+    return max(1, min(per_page, current_app.config["MAX_PAGE_SIZE"]))
+
+
+def encode_cursor(created_at, row_id):
+    return f"{created_at.isoformat()}_{row_id}"
+
+
+def decode_cursor(value):
+    """
+    "2026-01-27T21:35:55.908555_2" -> (datetime, 2), ose None nëse s'është valid.
+    """
+    if not value:
+        return None
+    ts, _, row_id = value.rpartition("_")
+    try:
+        return datetime.fromisoformat(ts), int(row_id)
+    except ValueError:
+        return None
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(q, created_col, id_col, per_page, after=None, before=None, key=None):
+    """
+    Keyset pagination mbi (created_at DESC, id DESC), pa OFFSET.
+    - after/before: cursor i dekoduar (created_at, id) nga decode_cursor
+    - key: merr (created_at, id) nga një rresht (default: row.created_at, row.id)
+    Çdo faqe është një query me LIMIT per_page + 1, sado thellë të jetë.
+    """
+    key = key or (lambda row: (row.created_at, row.id))
+    position = tuple_(created_col, id_col)
+
+    if before:
+        rows = (
+            q.filter(position > tuple_(*before))
+            .order_by(created_col.asc(), id_col.asc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_more = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        prev_cursor = encode_cursor(*key(rows[0])) if has_more else None
+        next_cursor = encode_cursor(*key(rows[-1])) if rows else None
+        return KeysetPage(rows, next_cursor, prev_cursor)
+
+    if after:
+        q = q.filter(position < tuple_(*after))
+
+    rows = q.order_by(created_col.desc(), id_col.desc()).limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(*key(rows[-1])) if has_more else None
+    prev_cursor = encode_cursor(*key(rows[0])) if (after and rows) else None
+    return KeysetPage(rows, next_cursor, prev_cursor)
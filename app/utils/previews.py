@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import select
+
+from ..extensions import db
+from ..models import Document
+from .storage import CHUNK_SIZE, document_path, preview_path, release, store_temp_file, temp_dir
+
+# Preview (thumbnail) për dokumentet imazh, jashtë request-it:
+# - upload-i vendos Document.preview_status = "pending" (tabela documents është edhe "job table")
+# - pas commit, enqueue() e dërgon te një ThreadPoolExecutor në proces (PREVIEW_WORKERS)
+# - `flask docs-previews` përpunon çdo "pending" të mbetur (restart, PREVIEW_WORKERS=0)
+# Preview ruhet te UPLOAD_FOLDER/previews/ab/<sha256>.jpg (një për përmbajtje, si blobs).
+# Pillow (requirements.txt): pa të, dokumentet nuk marrin preview (preview_status NULL);
+# init_previews e paralajmëron në log që në nisje.
+
+log = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "webp"}
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+_executor = None
+
+
+def pillow_available():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def init_previews(app):
+    if not pillow_available():
+        app.logger.warning(
+            "Pillow is not installed: document previews%s are disabled (pip install Pillow).",
+            " and image optimisation" if app.config.get("IMAGE_OPTIMIZE_ORIGINALS") else "",
+        )
+
+
+def wants_preview(filename):
+    ext = (filename or "").rsplit(".", 1)[-1].lower()
+    return ext in IMAGE_EXTENSIONS and pillow_available()
+
+
+def enqueue(doc_ids):
+    """Thirret pas commit; pa workers (PREVIEW_WORKERS=0) dokumentet mbeten "pending" për CLI."""
+    global _executor
+    workers = current_app.config.get("PREVIEW_WORKERS", 0)
+    if not doc_ids or workers <= 0:
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="previews")
+
+    app = current_app._get_current_object()
+    for doc_id in doc_ids:
+        _executor.submit(_run, app, doc_id)
+
+
+def _run(app, doc_id):
+    with app.app_context():
+        try:
+            process_document(doc_id)
+        except Exception:
+            log.exception("preview failed for document %s", doc_id)
+            db.session.rollback()
+
+
+def process_pending(limit=None):
+    """Përpunon dokumentet "pending" (CLI); kthen (ready, failed)."""
+    q = select(Document.id).where(Document.preview_status == PENDING).order_by(Document.id)
+    if limit:
+        q = q.limit(limit)
+
+    done = {READY: 0, FAILED: 0}
+    for doc_id in db.session.scalars(q).all():
+        status = process_document(doc_id)
+        if status in done:
+            done[status] += 1
+    return done[READY], done[FAILED]
+
+
+def process_document(doc_id):
+    """
+    Optimizon origjinalin (nëse IMAGE_OPTIMIZE_ORIGINALS) dhe krijon preview.
+    Statusi ruhet te Document.preview_status; commit në fund.
+    """
+    doc = db.session.get(Document, doc_id)
+    if doc is None or doc.preview_status != PENDING or not doc.sha256:
+        return None
+
+    try:
+        if current_app.config.get("IMAGE_OPTIMIZE_ORIGINALS"):
+            _optimize_original(doc)
+        _render_preview(document_path(doc), preview_path(doc.sha256))
+        doc.preview_status = READY
+    except Exception:
+        db.session.rollback()
+        log.exception("preview failed for document %s", doc_id)
+        doc = db.session.get(Document, doc_id)
+        doc.preview_status = FAILED
+
+    db.session.commit()
+    return doc.preview_status
+
+
+def _render_preview(src, dest):
+    from PIL import Image, ImageOps
+
+    if os.path.exists(dest):  # e njëjta përmbajtje, preview ekziston
+        return
+
+    size = current_app.config.get("PREVIEW_SIZE", 480)
+    with Image.open(src) as im:
+        im.draft("RGB", (size, size))  # JPEG: dekodim i zvogëluar, pa ngarkuar 12 MP në memorie
+        im = ImageOps.exif_transpose(im)
+        im.thumbnail((size, size))
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=temp_dir())
+        with os.fdopen(fd, "wb") as out:
+            im.save(out, "JPEG", quality=80, optimize=True)
+    os.replace(tmp, dest)
+
+
+def _optimize_original(doc):
+    """
+    Ri-kodon JPEG/PNG më të mëdha se IMAGE_MAX_DIMENSION; nëse rezultati është më i vogël,
+    dokumenti kalon te blob-i i ri dhe referenca e vjetër lirohet (docs-gc e fshin).
+    """
+    from PIL import Image, ImageOps
+
+    max_dim = current_app.config.get("IMAGE_MAX_DIMENSION", 2560)
+    src = document_path(doc)
+
+    with Image.open(src) as im:
+        fmt = im.format
+        if fmt not in ("JPEG", "PNG") or max(im.size) <= max_dim:
+            return
+        im = ImageOps.exif_transpose(im)
+        im.thumbnail((max_dim, max_dim))
+
+        fd, tmp = tempfile.mkstemp(dir=temp_dir())
+        with os.fdopen(fd, "wb") as out:
+            if fmt == "JPEG":
+                im.convert("RGB").save(out, "JPEG", quality=85, optimize=True, progressive=True)
+            else:
+                im.save(out, "PNG", optimize=True)
+
+    size = os.path.getsize(tmp)
+    if size >= (doc.size_bytes or os.path.getsize(src)):
+        os.remove(tmp)
+        return
+
+    digest = hashlib.sha256()
+    with open(tmp, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    blob = store_temp_file(tmp, digest.hexdigest(), size)
+    release(doc.sha256)
+    doc.sha256 = blob.sha256
+    doc.size_bytes = blob.size_bytes
+    doc.file_path = blob.key
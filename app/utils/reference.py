@@ -1,40 +1,80 @@
 from datetime import datetime
-from sqlalchemy import func
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from ..extensions import db
-from ..models import Booking, Payment
+from ..models import Booking, Payment, Sequence
+
+# Numrat alokohen nga tabela `sequences` (një rresht për prefix + vit):
+#   UPDATE sequences SET value = value + n WHERE name = ? RETURNING value
+# - konstant në kohë (pa max() + LIKE scan) dhe pa kolizione mes request-eve
+# - n > 1 rezervon një bllok (import / bulk)
+# Në PostgreSQL alokimi bëhet në transaksion më vete (si sekuencat native):
+# lock-u i rreshtit lirohet menjëherë, me kosto vrima në numërim nëse request-i dështon.
+# SQLite ka vetëm një writer, ndaj aty përdoret transaksioni i session-it.
+
+
+def _max_suffix(column, like):
+    """Stmt për numrin më të madh ekzistues (vetëm herën e parë që krijohet sekuenca)."""
+    return select(func.max(column)).where(column.like(like))
 
-def next_booking_reference(prefix="OUT"):
-    year = datetime.utcnow().year
-    like = f"{prefix}-{year}-%"
 
-    last_ref = (
-        db.session.query(func.max(Booking.reference))
-        .filter(Booking.reference.like(like))
-        .scalar()
+def _allocate(conn, name, count, seed_stmt):
+    bump = (
+        update(Sequence.__table__)
+        .where(Sequence.name == name)
+        .values(value=Sequence.value + count)
+        .returning(Sequence.value)
     )
 
-    if not last_ref:
-        seq = 1
-    else:
-        # OUT-2026-000123
-        seq = int(last_ref.split("-")[-1]) + 1
+    last = conn.execute(bump).scalar()
+    if last is None:
+        # herën e parë: vazhdo nga numrat ekzistues (p.sh. OUT-2026-000123 -> 123)
+        last_no = conn.execute(seed_stmt).scalar() if seed_stmt is not None else None
+        start = int(last_no.split("-")[-1]) if last_no else 0
 
-    return f"{prefix}-{year}-{seq:06d}"
+        insert_ = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+        conn.execute(
+            insert_(Sequence.__table__).values(name=name, value=start).on_conflict_do_nothing(index_elements=["name"])
+        )
+        last = conn.execute(bump).scalar()
 
+    return last - count + 1
+
+
+def allocate(name, count=1, seed_stmt=None):
+    """
+    Rezervon `count` numra në sekuencën `name`; kthen të parin, d.m.th. numrat janë
+    [first, first + count).
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        with db.engine.begin() as conn:
+            return _allocate(conn, name, count, seed_stmt)
+
+    return _allocate(db.session.connection(), name, count, seed_stmt)
 
-def next_receipt_no():
-    year = datetime.utcnow().year
-    like = f"RCPT-{year}-%"
 
-    last_no = (
-        db.session.query(func.max(Payment.receipt_no))
-        .filter(Payment.receipt_no.like(like))
-        .scalar()
+def reserve_booking_references(count, prefix="OUT"):
+    year = datetime.utcnow().year
+    first = allocate(
+        f"{prefix}-{year}",
+        count,
+        _max_suffix(Booking.reference, f"{prefix}-{year}-%"),
     )
+    return [f"{prefix}-{year}-{seq:06d}" for seq in range(first, first + count)]
+
 
-    if not last_no:
-        seq = 1
-    else:
-        seq = int(last_no.split("-")[-1]) + 1
+def next_booking_reference(prefix="OUT"):
+    # OUT-2026-000123
+    return reserve_booking_references(1, prefix)[0]
 
+
+def next_receipt_no():
+    year = datetime.utcnow().year
+    seq = allocate(f"RCPT-{year}", 1, _max_suffix(Payment.receipt_no, f"RCPT-{year}-%"))
     return f"RCPT-{year}-{seq:06d}"
+
+
+def next_invoice_no():
+    year = datetime.utcnow().year
+    seq = allocate(f"INV-{year}", 1, _max_suffix(Booking.invoice_no, f"INV-{year}-%"))
+    return f"INV-{year}-{seq:06d}"
@@ -0,0 +1,193 @@
+from sqlalchemy import Date, case, delete, func, insert, literal, select, type_coerce, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..extensions import db
+from ..models import Booking, DailyAgentStats, Payment
+from .cache import invalidate_timeseries
+from .dates import datetime_range
+from .fx import rate_expr
+from .money import ZERO, Money, money
+
+STAT_COLUMNS = ("bookings", "revenue", "internal_cost", "paid", "payments")
+
+
+def _upsert(rows):
+    """
+    INSERT ... ON CONFLICT (day, agent_id, currency) DO UPDATE SET col = col + excluded.col
+    Rritje atomike në DB; punon në SQLite (>= 3.24) dhe PostgreSQL.
+    """
+    if not rows:
+        return
+    invalidate_timeseries(*(r["day"] for r in rows))
+
+    insert_ = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    table = DailyAgentStats.__table__
+    stmt = insert_(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.agent_id, table.c.currency],
+        set_={c: table.c[c] + stmt.excluded[c] for c in STAT_COLUMNS},
+    )
+    db.session.execute(stmt, [{**dict.fromkeys(STAT_COLUMNS, 0), **r} for r in rows])
+
+
+def booking_snapshot(b: Booking):
+    """Vlerat e booking që hyjnë në rollup (merret para edit-it)."""
+    return {
+        "day": b.created_at.date(),
+        "agent_id": b.agent_id,
+        "currency": b.currency or "EUR",
+        "revenue": money(b.total_price),
+        "internal_cost": money(b.internal_cost),
+    }
+
+
+def record_booking(b: Booking, sign=1):
+    """Thirret pas flush (created_at duhet të jetë i vendosur)."""
+    snap = booking_snapshot(b)
+    _upsert([{
+        **snap,
+        "bookings": sign,
+        "revenue": sign * snap["revenue"],
+        "internal_cost": sign * snap["internal_cost"],
+    }])
+
+
+def record_booking_update(before, b: Booking):
+    """before = booking_snapshot(b) para ndryshimeve; heq vlerat e vjetra, shton të rejat."""
+    after = booking_snapshot(b)
+    if after == before:
+        invalidate_timeseries(before["day"])  # p.sh. destination / booking_type (utils/timeseries)
+        return
+    _upsert([
+        {**before, "bookings": -1, "revenue": -before["revenue"], "internal_cost": -before["internal_cost"]},
+        {**after, "bookings": 1},
+    ])
+
+
+def record_bookings(rows):
+    """
+    Bulk (import): rows = dict me created_at, agent_id, currency, total_price, internal_cost.
+    Agregohen në Python -> një upsert për (day, agent_id, currency), jo një për booking.
+    """
+    totals = {}
+    for r in rows:
+        key = (r["created_at"].date(), r["agent_id"], r["currency"] or "EUR")
+        t = totals.setdefault(key, {
+            "day": key[0], "agent_id": key[1], "currency": key[2],
+            "bookings": 0, "revenue": ZERO, "internal_cost": ZERO,
+        })
+        t["bookings"] += 1
+        t["revenue"] += money(r["total_price"])
+        t["internal_cost"] += money(r["internal_cost"])
+    _upsert(list(totals.values()))
+
+
+def record_payment(p: Payment, sign=1):
+    _upsert([{
+        "day": p.paid_at.date(),
+        "agent_id": p.agent_id,
+        "currency": p.currency or "EUR",
+        "paid": sign * money(p.amount),
+        "payments": sign,
+    }])
+
+
+def rebuild_rollups(date_from=None, date_to=None):
+    """
+    Rindërton daily_agent_stats nga bookings + payments (jo të arkivuara),
+    për të gjitha ditët ose vetëm për [date_from, date_to]. Kthen numrin e rreshtave.
+    """
+    table = DailyAgentStats.__table__
+
+    d = delete(table)
+    if date_from:
+        d = d.where(table.c.day >= date_from)
+    if date_to:
+        d = d.where(table.c.day <= date_to)
+    db.session.execute(d)
+    invalidate_timeseries()
+
+    zero = literal(0)
+    bookings = (
+        select(
+            func.date(Booking.created_at, type_=Date).label("day"),
+            Booking.agent_id.label("agent_id"),
+            func.coalesce(Booking.currency, "EUR").label("currency"),
+            literal(1).label("bookings"),
+            func.coalesce(Booking.total_price, 0).label("revenue"),
+            func.coalesce(Booking.internal_cost, 0).label("internal_cost"),
+            zero.label("paid"),
+            zero.label("payments"),
+        )
+        .where(Booking.is_archived == False)  # noqa: E712
+        .where(*datetime_range(Booking.created_at, date_from, date_to))
+    )
+    payments = (
+        select(
+            func.date(Payment.paid_at, type_=Date),
+            Payment.agent_id,
+            func.coalesce(Payment.currency, "EUR"),
+            zero,
+            zero,
+            zero,
+            Payment.amount,
+            literal(1),
+        )
+        .where(Payment.is_archived == False)  # noqa: E712
+        .where(*datetime_range(Payment.paid_at, date_from, date_to))
+    )
+
+    facts = union_all(bookings, payments).subquery()
+    grouped = select(
+        facts.c.day,
+        facts.c.agent_id,
+        facts.c.currency,
+        *[func.sum(facts.c[c]) for c in STAT_COLUMNS],
+    ).group_by(facts.c.day, facts.c.agent_id, facts.c.currency)
+
+    result = db.session.execute(
+        insert(table).from_select(["day", "agent_id", "currency", *STAT_COLUMNS], grouped)
+    )
+    return result.rowcount
+
+
+def rollup_totals(agent_id=None, date_from=None, date_to=None):
+    """
+    Shumat nga daily_agent_stats për një agent (ose të gjithë) dhe një periudhë ditësh,
+    të konvertuara në BASE_CURRENCY brenda query-t (kursi i ditës, utils/fx.rate_expr).
+    Një query e vetme; kosto varet nga numri i ditëve, jo nga madhësia e bookings/payments.
+    missing_fx = rreshta (ditë/agent/monedhë) pa kurs, që nuk hyjnë në shuma.
+    """
+    conds = []
+    if agent_id is not None:
+        conds.append(DailyAgentStats.agent_id == agent_id)
+    if date_from:
+        conds.append(DailyAgentStats.day >= date_from)
+    if date_to:
+        conds.append(DailyAgentStats.day <= date_to)
+
+    rows = (
+        select(
+            DailyAgentStats.bookings,
+            DailyAgentStats.revenue,
+            DailyAgentStats.internal_cost,
+            DailyAgentStats.paid,
+            DailyAgentStats.payments,
+            rate_expr(DailyAgentStats.currency, DailyAgentStats.day).label("rate"),
+        )
+        .where(*conds)
+        .subquery()
+    )
+
+    totals = db.session.execute(
+        select(
+            func.coalesce(func.sum(rows.c.bookings), 0),
+            func.coalesce(func.sum(type_coerce(rows.c.revenue * rows.c.rate, Money)), 0),
+            func.coalesce(func.sum(type_coerce(rows.c.internal_cost * rows.c.rate, Money)), 0),
+            func.coalesce(func.sum(type_coerce(rows.c.paid * rows.c.rate, Money)), 0),
+            func.coalesce(func.sum(rows.c.payments), 0),
+            func.coalesce(func.sum(case((rows.c.rate.is_(None), 1), else_=0)), 0),
+        )
+    ).one()
+
+    return dict(zip((*STAT_COLUMNS, "missing_fx"), totals))
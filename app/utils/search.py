@@ -0,0 +1,118 @@
+from sqlalchemy import column, or_, select, table, text
+
+from ..extensions import db
+from ..models import Booking, Client
+
+# SQLite: FTS5 me tokenizer trigram (substring match, case-insensitive), rowid = id.
+# PostgreSQL: ilike mbetet, por mbështetet nga indekse GIN pg_trgm (shih migration).
+clients_fts = table("clients_fts", column("rowid"))
+bookings_fts = table("bookings_fts", column("rowid"))
+
+FTS_TABLES = {
+    "clients_fts": "first_name, last_name, email, phone",
+    "bookings_fts": "reference",
+}
+
+# trigram nuk gjen dot për terma < 3 karaktere -> fallback te ilike
+MIN_FTS_TERM = 3
+
+
+def uses_fts():
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def _fts_match(fts, term):
+    """rowid-t që përputhen; termi kalon si frazë FTS5 ("..."), pa operatorë."""
+    phrase = '"' + term.replace('"', '""') + '"'
+    param = f"{fts.name}_q"
+    return select(fts.c.rowid).where(text(f"{fts.name} MATCH :{param}").bindparams(**{param: phrase}))
+
+
+def client_search_filter(term):
+    """Kusht për Client: emër / mbiemër / email / telefon që përmban termin."""
+    if uses_fts() and len(term) >= MIN_FTS_TERM:
+        return Client.id.in_(_fts_match(clients_fts, term))
+
+    like = f"%{term}%"
+    return or_(
+        Client.first_name.ilike(like),
+        Client.last_name.ilike(like),
+        Client.email.ilike(like),
+        Client.phone.ilike(like),
+    )
+
+
+def booking_search_filter(term):
+    """Kusht për Booking: reference, ose klienti i booking përputhet (si client_search_filter)."""
+    if uses_fts() and len(term) >= MIN_FTS_TERM:
+        return or_(
+            Booking.id.in_(_fts_match(bookings_fts, term)),
+            Booking.client_id.in_(_fts_match(clients_fts, term)),
+        )
+
+    return or_(Booking.reference.ilike(f"%{term}%"), client_search_filter(term))
+
+
+def ensure_search_tables():
+    if not uses_fts():
+        return
+    for name, columns in FTS_TABLES.items():
+        db.session.execute(
+            text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5({columns}, tokenize='trigram')")
+        )
+
+
+def index_client(c: Client):
+    """Thirret pas flush të klientit (create / edit), në të njëjtin transaksion."""
+    index_clients([
+        {"id": c.id, "first_name": c.first_name, "last_name": c.last_name, "email": c.email, "phone": c.phone}
+    ])
+
+
+def index_booking(b: Booking):
+    index_bookings([{"id": b.id, "reference": b.reference}])
+
+
+def index_clients(rows):
+    """Bulk (executemany): rows = dict me id, first_name, last_name, email, phone."""
+    if not rows or not uses_fts():
+        return
+    db.session.execute(
+        text(
+            "INSERT OR REPLACE INTO clients_fts (rowid, first_name, last_name, email, phone) "
+            "VALUES (:id, :first_name, :last_name, :email, :phone)"
+        ),
+        rows,
+    )
+
+
+def index_bookings(rows):
+    """Bulk (executemany): rows = dict me id, reference."""
+    if not rows or not uses_fts():
+        return
+    db.session.execute(
+        text("INSERT OR REPLACE INTO bookings_fts (rowid, reference) VALUES (:id, :reference)"),
+        rows,
+    )
+
+
+def rebuild_search_index():
+    """
+    Rindërton indekset FTS nga clients/bookings (no-op në PostgreSQL).
+    Kthen (clients, bookings) të indeksuar.
+    """
+    if not uses_fts():
+        return 0, 0
+    ensure_search_tables()
+    db.session.execute(text("DELETE FROM clients_fts"))
+    db.session.execute(text("DELETE FROM bookings_fts"))
+    clients = db.session.execute(
+        text(
+            "INSERT INTO clients_fts (rowid, first_name, last_name, email, phone) "
+            "SELECT id, first_name, last_name, email, phone FROM clients"
+        )
+    )
+    bookings = db.session.execute(
+        text("INSERT INTO bookings_fts (rowid, reference) SELECT id, reference FROM bookings")
+    )
+    return clients.rowcount, bookings.rowcount
@@ -0,0 +1,278 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+from flask import abort, current_app, request, send_file
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from werkzeug.http import dump_options_header
+
+from ..extensions import db
+from ..models import Blob, Document
+
+# Dokumentet ruhen sipas përmbajtjes (content-addressed):
+#   UPLOAD_FOLDER/blobs/ab/cd/abcd...  (sha256, 2 nivele shard)
+# - upload-i streamohet në një skedar temp (UPLOAD_FOLDER/tmp) ndërsa llogaritet sha256
+# - i njëjti skedar (p.sh. pasaporta e një klienti që rikthehet) ruhet një herë
+# - blobs.ref_count = sa Document e përdorin; `flask docs-gc` fshin ato pa referenca
+# Document.file_path mban çelësin relativ ("blobs/ab/cd/<sha>"), jo path absolut.
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def upload_root():
+    return current_app.config.get("UPLOAD_FOLDER", "uploads")
+
+
+def blob_key(sha256):
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def blob_path(sha256):
+    return os.path.join(upload_root(), *blob_key(sha256).split("/"))
+
+
+def preview_path(sha256):
+    # thumbnail JPEG (utils/previews.py), një për përmbajtje
+    return os.path.join(upload_root(), "previews", sha256[:2], f"{sha256}.jpg")
+
+
+def temp_dir():
+    # në të njëjtin filesystem me blobs -> os.replace është atomik
+    path = os.path.join(upload_root(), "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class StoredBlob:
+    def __init__(self, sha256, size_bytes):
+        self.sha256 = sha256
+        self.size_bytes = size_bytes
+
+    @property
+    def key(self):
+        return blob_key(self.sha256)
+
+    @property
+    def path(self):
+        return blob_path(self.sha256)
+
+
+def store_stream(stream):
+    """
+    Lexon stream-in në copa (CHUNK_SIZE) drejt një skedari temp duke llogaritur
+    sha256, pastaj e vendos te blob-i (shih store_temp_file). Thirret brenda
+    transaksionit të request-it (rrit ref_count).
+    """
+    digest = hashlib.sha256()
+    size = 0
+
+    fd, tmp = tempfile.mkstemp(dir=temp_dir())
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    return store_temp_file(tmp, digest.hexdigest(), size)
+
+
+def store_temp_file(tmp, sha256, size_bytes):
+    """
+    Vendos skedarin temp (hash-i i njohur) te path-i i blob-it dhe rrit ref_count.
+    Referenca regjistrohet para se skedari të vendoset, ndaj një docs-gc paralel
+    nuk e fshin blob-in pas nesh; os.replace mbishkruan atomikisht të njëjtën përmbajtje.
+    """
+    _acquire(sha256, size_bytes)
+
+    path = blob_path(sha256)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp, path)
+    return StoredBlob(sha256, size_bytes)
+
+
+def _acquire(sha256, size_bytes):
+    insert_ = postgresql.insert if db.session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    table = Blob.__table__
+    now = datetime.utcnow()
+    stmt = insert_(table).values(
+        sha256=sha256, size_bytes=size_bytes, ref_count=1, created_at=now, last_acquired_at=now
+    )
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.sha256],
+            set_={"ref_count": table.c.ref_count + 1, "last_acquired_at": now},
+        )
+    )
+
+
+def release(sha256):
+    """Kur një Document fshihet (jo arkivohet); skedari hiqet më vonë nga docs-gc."""
+    db.session.execute(update(Blob).where(Blob.sha256 == sha256).values(ref_count=Blob.ref_count - 1))
+
+
+def document_key(doc):
+    """
+    Path relativ ndaj UPLOAD_FOLDER. Dokumentet e vjetra kanë path absolut
+    (shpesh nga një makinë tjetër) -> merret pjesa pas ".../uploads/".
+    """
+    if doc.sha256:
+        return blob_key(doc.sha256)
+    path = (doc.file_path or "").replace("\\", "/")
+    _, sep, rest = path.rpartition("/uploads/")
+    return rest if sep else path.lstrip("/")
+
+
+def document_path(doc):
+    """Path absolut i skedarit (None nëse çelësi është i pavlefshëm)."""
+    key = document_key(doc)
+    if not key or ".." in key.split("/"):
+        return None
+    return os.path.join(upload_root(), *key.split("/"))
+
+
+def send_document(doc, as_attachment=False):
+    """
+    Dërgon dokumentin pa e lexuar në Python:
+    - X_ACCEL_REDIRECT_PREFIX -> nginx e shërben vetë (location internal mbi UPLOAD_FOLDER)
+    - USE_X_SENDFILE -> send_file vendos X-Sendfile (Apache / lighttpd)
+    - përndryshe send_file me path (wsgi.file_wrapper / sendfile), Range dhe ETag
+    ETag = sha256 për blobs (përmbajtja nuk ndryshon kurrë nën të njëjtin çelës).
+    """
+    key = document_key(doc)
+    path = document_path(doc)
+    if not path or not os.path.isfile(path):
+        abort(404)
+
+    name = doc.original_name or os.path.basename(path)
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    # 304 para çdo pune me skedarin (edhe për X-Accel)
+    if doc.sha256 and request.if_none_match.contains(doc.sha256):
+        resp = current_app.response_class(status=304)
+        resp.set_etag(doc.sha256)
+        resp.cache_control.private = True
+        return resp
+
+    prefix = current_app.config.get("X_ACCEL_REDIRECT_PREFIX")
+    if prefix:
+        resp = current_app.response_class(mimetype=mimetype)
+        resp.headers["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{key}"
+        resp.headers["Content-Disposition"] = _disposition(name, as_attachment)
+        if doc.sha256:
+            resp.set_etag(doc.sha256)
+    else:
+        resp = send_file(
+            path,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=name,
+            conditional=True,  # Range / If-Range / If-None-Match / If-Modified-Since
+            etag=doc.sha256 or True,
+        )
+
+    resp.cache_control.private = True
+    return resp
+
+
+def _disposition(name, as_attachment):
+    # si send_file: filename* për emra jo-ASCII
+    try:
+        name.encode("ascii")
+        options = {"filename": name}
+    except UnicodeEncodeError:
+        options = {"filename*": f"UTF-8''{quote(name)}"}
+    return dump_options_header("attachment" if as_attachment else "inline", options)
+
+
+def collect_garbage(grace_seconds=3600, dry_run=False):
+    """
+    - rillogarit ref_count nga documents (edhe të arkivuarat mbajnë referencën)
+    - fshin blobs pa referenca (rresht + skedar)
+    - fshin skedarë jetimë në disk (pa rresht në blobs, p.sh. upload me rollback)
+      dhe skedarë temp
+    Preken vetëm blobs / skedarë më të vjetër se grace_seconds (last_acquired_at / mtime):
+    një upload që ka bërë _acquire por s'ka bërë ende commit të Document nuk fshihet.
+    Bën vetë commit para se të fshijë skedarët (dry_run: asgjë nuk ndryshon).
+    Kthen dict me numrat dhe bajtet e liruara.
+    """
+    stats = {"blobs": 0, "orphans": 0, "temp": 0, "bytes": 0}
+
+    cutoff = time.time() - grace_seconds
+    acquired_before = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    settled = or_(Blob.last_acquired_at.is_(None), Blob.last_acquired_at < acquired_before)
+
+    refs = (
+        select(func.count(Document.id))
+        .where(Document.sha256 == Blob.sha256)
+        .correlate(Blob)
+        .scalar_subquery()
+    )
+    # PostgreSQL: një _acquire i pa-commit-uar mban lock-un e rreshtit; pas tij WHERE rivlerësohet
+    # mbi last_acquired_at e ri -> rreshti anashkalohet
+    db.session.execute(update(Blob).where(settled, Blob.ref_count != refs).values(ref_count=refs))
+
+    dead = db.session.execute(
+        select(Blob.sha256, Blob.size_bytes).where(settled, Blob.ref_count <= 0).with_for_update()
+    ).all()
+    for sha256, size_bytes in dead:
+        stats["blobs"] += 1
+        stats["bytes"] += size_bytes or 0
+
+    if dry_run:
+        dead = []
+    elif dead:
+        db.session.execute(delete(Blob).where(Blob.sha256.in_([sha256 for sha256, _ in dead])))
+    if not dry_run:
+        db.session.commit()
+
+    # skedarët vetëm pas commit; një blob i rifutur ndërkohë (upload i ri) mbetet
+    revived = set(db.session.scalars(select(Blob.sha256).where(Blob.sha256.in_([d[0] for d in dead])))) if dead else set()
+    for sha256, _ in dead:
+        path = blob_path(sha256)
+        if sha256 in revived or (os.path.exists(path) and os.path.getmtime(path) > cutoff):
+            continue
+        _remove(path)
+        _remove(preview_path(sha256))
+
+    blobs_dir = os.path.join(upload_root(), "blobs")
+
+    for dirpath, _, filenames in os.walk(blobs_dir):
+        if not filenames:
+            continue
+        known = set(db.session.scalars(select(Blob.sha256).where(Blob.sha256.in_(filenames))))
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if name in known or os.path.getmtime(path) > cutoff:
+                continue
+            stats["orphans"] += 1
+            stats["bytes"] += os.path.getsize(path)
+            if not dry_run:
+                _remove(path)
+
+    for entry in os.scandir(temp_dir()):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            stats["temp"] += 1
+            stats["bytes"] += entry.stat().st_size
+            if not dry_run:
+                _remove(entry.path)
+
+    return stats
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,223 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, func, literal, null, select, type_coerce, union_all
+
+from ..extensions import db
+from ..models import Booking, DailyAgentStats, Payment, User
+from .cache import cache_version, timeseries_cache
+from .dates import bucket_expr, bucket_start, bucket_starts, datetime_range
+from .fx import rate_expr
+from .money import ZERO, Money, money
+
+# Seri kohore (bookings, revenue, paid, profit) sipas ditës / javës / muajit, në BASE_CURRENCY:
+# - të gjitha bucket-et në një query me GROUP BY (bucket, dimension), bucket = utils/dates.bucket_expr
+# - pa dimension ose sipas agjentit: mbi daily_agent_stats (si compute_kpis)
+# - sipas destination / booking_type: bookings (created_at) + payments (paid_at) në një UNION ALL,
+#   sepse rollup-et nuk i kanë këto kolona
+# - bucket-et e mbyllura (para atij aktual) ruhen te timeseries_cache; në çdo request
+#   rillogaritet vetëm bucket-i i hapur. Çelësi përfshin cache_version("timeseries") (rritet në
+#   commit-in e shkrimeve në ditë të kaluara, utils/rollups) dhe cache_version("fx") (fx-load),
+#   ndaj çdo worker i sheh ndryshimet pa pritur TTL.
+# - missing_fx: rreshtat pa kurs drejt BASE_CURRENCY, që nuk hyjnë në shuma (si rollup_totals)
+
+DIMENSIONS = ("agent", "destination", "booking_type")
+METRICS = ("bookings", "revenue", "paid", "profit")
+
+DEFAULT_BUCKETS = {"day": 30, "week": 12, "month": 12}
+MAX_SERIES = 8  # seritë e tjera bashkohen te "Other"
+
+
+def today():
+    # created_at / paid_at ruhen në UTC
+    return datetime.utcnow().date()
+
+
+def default_range(grain):
+    """DEFAULT_BUCKETS[grain] bucket-e, i fundit ai aktual (deri sot)."""
+    end = today()
+    start = bucket_start(end, grain)
+    for _ in range(DEFAULT_BUCKETS[grain] - 1):
+        start = bucket_start(start - timedelta(days=1), grain)
+    return start, end
+
+
+def bucket_rows(grain, dimension, agent_id, date_from, date_to):
+    """
+    Rreshta (bucket, key, bookings, revenue, internal_cost, paid, missing_fx) për ditët
+    [date_from, date_to], një query. key = None pa dimension.
+    """
+    if dimension in ("destination", "booking_type"):
+        return _booking_rows(grain, getattr(Booking, dimension), agent_id, date_from, date_to)
+    return _rollup_rows(grain, dimension == "agent", agent_id, date_from, date_to)
+
+
+def _grouped(facts):
+    """
+    GROUP BY (bucket, key) mbi një subquery me shumat origjinale + `rate` (kursi llogaritet
+    një herë për rresht): shumat në BASE_CURRENCY dhe numri i rreshtave pa kurs.
+    """
+    def converted(column):
+        return func.sum(type_coerce(column * facts.c.rate, Money))
+
+    q = select(
+        facts.c.bucket,
+        facts.c.key,
+        func.sum(facts.c.bookings),
+        converted(facts.c.revenue),
+        converted(facts.c.internal_cost),
+        converted(facts.c.paid),
+        func.sum(case((facts.c.rate.is_(None), 1), else_=0)),
+    ).group_by(facts.c.bucket, facts.c.key)
+    return [tuple(r) for r in db.session.execute(q)]
+
+
+def _rollup_rows(grain, by_agent, agent_id, date_from, date_to):
+    stats = DailyAgentStats
+    conds = [stats.day >= date_from, stats.day <= date_to]
+    if agent_id is not None:
+        conds.append(stats.agent_id == agent_id)
+
+    facts = select(
+        bucket_expr(grain, stats.day).label("bucket"),
+        (stats.agent_id if by_agent else null()).label("key"),
+        stats.bookings.label("bookings"),
+        stats.revenue.label("revenue"),
+        stats.internal_cost.label("internal_cost"),
+        stats.paid.label("paid"),
+        rate_expr(stats.currency, stats.day).label("rate"),
+    ).where(*conds).subquery()
+    return _grouped(facts)
+
+
+def _booking_rows(grain, column, agent_id, date_from, date_to):
+    zero = literal(0, Money)
+
+    bookings = (
+        select(
+            bucket_expr(grain, Booking.created_at).label("bucket"),
+            column.label("key"),
+            literal(1).label("bookings"),
+            Booking.total_price.label("revenue"),
+            Booking.internal_cost.label("internal_cost"),
+            zero.label("paid"),
+            rate_expr(Booking.currency, Booking.created_at).label("rate"),
+        )
+        .where(Booking.is_archived == False)  # noqa: E712
+        .where(*datetime_range(Booking.created_at, date_from, date_to))
+    )
+    payments = (
+        select(
+            bucket_expr(grain, Payment.paid_at),
+            column,
+            literal(0),
+            zero,
+            zero,
+            Payment.amount,
+            rate_expr(Payment.currency, Payment.paid_at),
+        )
+        .join(Booking, Booking.id == Payment.booking_id)
+        .where(Payment.is_archived == False)  # noqa: E712
+        .where(*datetime_range(Payment.paid_at, date_from, date_to))
+    )
+    if agent_id is not None:
+        # si booking_scope_query / payments_scope_query
+        bookings = bookings.where(Booking.agent_id == agent_id)
+        payments = payments.where(Payment.agent_id == agent_id)
+
+    return _grouped(union_all(bookings, payments).subquery())
+
+
+def cached_rows(grain, dimension, agent_id, date_from, date_to):
+    """
+    bucket_rows për [date_from, date_to]: pjesa para bucket-it aktual nga cache
+    (TIMESERIES_CACHE_TTL), bucket-i i hapur gjithmonë nga DB.
+    """
+    open_start = bucket_start(today(), grain)
+    if date_to < open_start:
+        closed_to, open_from = date_to, None
+    else:
+        closed_to, open_from = open_start - timedelta(days=1), max(date_from, open_start)
+
+    rows = []
+    if date_from <= closed_to:
+        key = (grain, dimension, agent_id, date_from, closed_to, cache_version("timeseries"), cache_version("fx"))
+        ttl = current_app.config.get("TIMESERIES_CACHE_TTL", 0)
+        rows.extend(timeseries_cache.get_or_set(
+            key, ttl, lambda: bucket_rows(grain, dimension, agent_id, date_from, closed_to)
+        ))
+    if open_from is not None:
+        rows.extend(bucket_rows(grain, dimension, agent_id, open_from, date_to))
+    return rows
+
+
+def build_series(grain, dimension, agent_id, date_from, date_to):
+    """
+    Dict për faqen / JSON:
+    buckets: [date], totals: një pikë për bucket, series: [{key, label, total, points}]
+    (pikë = dict me METRICS), seritë sipas revenue, maksimumi MAX_SERIES + "Other";
+    missing_fx: rreshtat pa kurs në periudhë (jashtë shumave).
+    """
+    starts = bucket_starts(date_from, date_to, grain)
+    index = {start: i for i, start in enumerate(starts)}
+
+    def empty():
+        return [{"bookings": 0, "revenue": ZERO, "paid": ZERO, "profit": ZERO} for _ in starts]
+
+    def add(points, i, bookings, revenue, internal_cost, paid):
+        p = points[i]
+        p["bookings"] += int(bookings or 0)
+        p["revenue"] += money(revenue)
+        p["paid"] += money(paid)
+        p["profit"] += money(revenue) - money(internal_cost)
+
+    totals = empty()
+    by_key = {}
+    missing_fx = 0
+    for bucket, key, *values, missing in cached_rows(grain, dimension, agent_id, date_from, date_to):
+        i = index.get(bucket)
+        if i is None:
+            continue
+        missing_fx += int(missing or 0)
+        add(totals, i, *values)
+        if dimension:
+            add(by_key.setdefault(key, empty()), i, *values)
+
+    labels = _labels(dimension, by_key)
+    series = sorted(
+        (
+            {"key": key, "label": labels.get(key, "—"), "total": sum((p["revenue"] for p in points), ZERO), "points": points}
+            for key, points in by_key.items()
+        ),
+        key=lambda s: s["total"],
+        reverse=True,
+    )
+    if len(series) > MAX_SERIES:
+        other = empty()
+        for s in series[MAX_SERIES - 1:]:
+            for p, q in zip(other, s["points"]):
+                for m in METRICS:
+                    p[m] += q[m]
+        series = series[:MAX_SERIES - 1] + [{
+            "key": None,
+            "label": "Other",
+            "total": sum((p["revenue"] for p in other), ZERO),
+            "points": other,
+        }]
+
+    return {
+        "grain": grain,
+        "dimension": dimension,
+        "buckets": starts,
+        "totals": totals,
+        "series": series,
+        "missing_fx": missing_fx,
+    }
+
+
+def _labels(dimension, by_key):
+    if dimension == "agent":
+        ids = [k for k in by_key if k is not None]
+        names = db.session.execute(select(User.id, User.full_name).where(User.id.in_(ids))).all() if ids else []
+        return dict(names)
+    return {k: k for k in by_key if k}
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select, update
+from werkzeug.utils import secure_filename
+
+from ..bookings.forms import DOC_EXTENSIONS, DOC_TYPES
+from ..extensions import db
+from ..models import UploadSession
+from .storage import CHUNK_SIZE, store_temp_file
+
+# Upload me copa, i rifillueshëm (për skedarë mbi MAX_CONTENT_LENGTH):
+#   1. init      -> UploadSession (madhësia totale, sha256 opsional)
+#   2. PUT chunk -> ?offset=N, body = bajtet; copa e plotë shtohet te UPLOAD_FOLDER/partial/<id>.part
+#      vetëm pasi `received` avancon (UPDATE ... WHERE received = offset)
+#   3. finalize  -> sha256 i skedarit verifikohet, pastaj kalon te blob-i (storage.store_temp_file);
+#      sha256 kthehet te klienti, që e krahason me atë që llogariti vetë
+# Një PUT i ndërprerë nuk e prek .part, ndaj upload-i rifillon nga offset-i i fundit.
+
+DOC_TYPE_VALUES = {v for v, _ in DOC_TYPES}
+
+
+class OffsetMismatch(Exception):
+    """Copa nuk fillon te `received`; klienti duhet të vazhdojë nga offset."""
+
+    def __init__(self, offset):
+        super().__init__(f"expected offset {offset}")
+        self.offset = offset
+
+
+def part_dir():
+    # jo në tmp/: docs-gc fshin tmp/ pas një ore, kurse një upload mund të rifillojë më vonë
+    path = os.path.join(current_app.config.get("UPLOAD_FOLDER", "uploads"), "partial")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def part_path(upload):
+    return os.path.join(part_dir(), f"{upload.id}.part")
+
+
+def start_upload(booking, user_id, doc_type, filename, size, sha256=None, is_required=False):
+    """Krijon UploadSession; ValueError për të dhëna të pavlefshme."""
+    filename = secure_filename(filename or "")
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if not filename or ext not in DOC_EXTENSIONS:
+        raise ValueError(f"Allowed: {', '.join(DOC_EXTENSIONS)}")
+    if doc_type not in DOC_TYPE_VALUES:
+        raise ValueError("Invalid doc type.")
+
+    max_size = current_app.config.get("UPLOAD_MAX_SIZE", 0)
+    if not isinstance(size, int) or size <= 0 or (max_size and size > max_size):
+        raise ValueError(f"Size must be between 1 and {max_size} bytes.")
+
+    sha256 = (sha256 or "").strip().lower() or None
+    if sha256 and (len(sha256) != 64 or any(ch not in "0123456789abcdef" for ch in sha256)):
+        raise ValueError("sha256 must be 64 hex characters.")
+
+    upload = UploadSession(
+        id=uuid.uuid4().hex,
+        booking_id=booking.id,
+        user_id=user_id,
+        doc_type=doc_type,
+        is_required=bool(is_required),
+        original_name=filename,
+        total_size=size,
+        received=0,
+        sha256=sha256,
+    )
+    db.session.add(upload)
+    open(part_path(upload), "wb").close()
+    return upload
+
+
+def write_chunk(upload, offset, stream, chunk_sha256=None):
+    """
+    Shton copën te skedari .part nga offset; kthen offset-in e ri.
+    OffsetMismatch nëse offset != received, ValueError për checksum / madhësi.
+    """
+    if offset != upload.received:
+        raise OffsetMismatch(upload.received)
+
+    digest = hashlib.sha256()
+    written = 0
+
+    # Copa shkon fillimisht në një skedar të përkohshëm: .part preket vetëm pasi ky request
+    # ka fituar UPDATE-in më poshtë, ndaj një PUT paralel / i vonuar nuk e prish.
+    with tempfile.TemporaryFile(dir=part_dir()) as tmp:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if offset + written + len(chunk) > upload.total_size:
+                raise ValueError("Chunk goes past the declared file size.")
+            digest.update(chunk)
+            tmp.write(chunk)
+            written += len(chunk)
+
+        if chunk_sha256 and digest.hexdigest() != chunk_sha256.strip().lower():
+            raise ValueError("Chunk checksum mismatch.")
+
+        # Avancim atomik: dy PUT paralelë me të njëjtin offset -> vetëm njëri kalon. Rreshti
+        # mbetet i bllokuar (lock i rreshtit / i DB-së në SQLite) deri në commit, pra edhe
+        # shkrimi te .part më poshtë bëhet nga një request i vetëm për upload.
+        result = db.session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload.id, UploadSession.received == offset)
+            .values(received=offset + written, updated_at=datetime.utcnow())
+        )
+        if result.rowcount != 1:
+            db.session.refresh(upload)
+            raise OffsetMismatch(upload.received)
+
+        tmp.seek(0)
+        path = part_path(upload)
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.seek(offset)
+            f.truncate()  # mbetje nga një PUT që shkroi por nuk arriti commit-in
+            shutil.copyfileobj(tmp, f, CHUNK_SIZE)
+
+    return offset + written
+
+
+def finalize_upload(upload):
+    """
+    Verifikon që skedari është i plotë dhe sha256 (nëse u deklarua), e kalon te
+    storage dhe fshin UploadSession. Kthen StoredBlob; ValueError nëse dështon.
+    """
+    if upload.received != upload.total_size:
+        raise ValueError(f"Upload incomplete ({upload.received}/{upload.total_size} bytes).")
+
+    path = part_path(upload)
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+
+    sha256 = digest.hexdigest()
+    if upload.sha256 and sha256 != upload.sha256:
+        cancel_upload(upload)
+        raise ValueError("Checksum mismatch; upload discarded, please start again.")
+
+    blob = store_temp_file(path, sha256, upload.total_size)
+    db.session.delete(upload)
+    return blob
+
+
+def cancel_upload(upload):
+    _remove(part_path(upload))
+    db.session.delete(upload)
+
+
+def expire_uploads(ttl_seconds, dry_run=False):
+    """Fshin sesionet pa aktivitet për ttl_seconds dhe skedarët .part të tyre (docs-gc)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+    stale = UploadSession.updated_at < cutoff
+
+    ids = db.session.scalars(select(UploadSession.id).where(stale)).all()
+    if not dry_run:
+        db.session.execute(delete(UploadSession).where(UploadSession.id.in_(ids)))
+        for upload_id in ids:
+            _remove(os.path.join(part_dir(), f"{upload_id}.part"))
+    return len(ids)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,85 @@
+import io
+import os
+import zipfile
+from datetime import datetime
+
+from flask import Response, stream_with_context
+
+from .storage import CHUNK_SIZE, document_path
+
+# ZIP i ndërtuar gjatë streaming: zipfile shkruan në një "sink" që nuk bën seek
+# (përdor data descriptors), dhe ne nxjerrim bajtet e shkruara pas çdo copë.
+# Asnjë arkiv temp në disk, në memorie mbahet vetëm copa aktuale (~1 MB).
+
+
+class _Sink(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _date_time(value):
+    value = max(value or datetime.utcnow(), datetime(1980, 1, 1))  # ZIP nuk njeh data para 1980
+    return value.timetuple()[:6]
+
+
+def zip_stream(entries, compression=zipfile.ZIP_STORED):
+    """
+    entries: iterator (arcname, path, datetime). Skedarët që mungojnë në disk
+    anashkalohen dhe listohen te MISSING.txt brenda arkivit.
+    """
+    sink = _Sink()
+    missing = []
+
+    with zipfile.ZipFile(sink, "w", compression=compression, allowZip64=True) as zf:
+        for arcname, path, modified in entries:
+            if not path or not os.path.isfile(path):
+                missing.append(arcname)
+                continue
+
+            info = zipfile.ZipInfo(arcname, date_time=_date_time(modified))
+            info.compress_type = compression
+            info.file_size = os.path.getsize(path)  # vendos nëse duhet ZIP64
+
+            with open(path, "rb") as src, zf.open(info, "w") as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+
+        if missing:
+            zf.writestr("MISSING.txt", "\n".join(missing) + "\n")
+
+    yield sink.drain()
+
+
+def document_entries(docs, folder=None):
+    """(arcname, path, created_at) për Document; id në emër që emrat të mos përplasen."""
+    for doc in docs:
+        name = os.path.basename((doc.original_name or doc.file_path or "").replace("\\", "/")) or "file"
+        arcname = f"{doc.doc_type}_{doc.id}_{name}"
+        if folder:
+            arcname = f"{folder(doc)}/{arcname}"
+        yield arcname, document_path(doc), doc.created_at
+
+
+def zip_response(filename, entries, compress=False):
+    return Response(
+        stream_with_context(zip_stream(entries, zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
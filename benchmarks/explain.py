@@ -0,0 +1,49 @@
+"""
+Print the query plan of each report query (EXPLAIN QUERY PLAN on SQLite,
+EXPLAIN on PostgreSQL) against DATABASE_URL.
+
+    DATABASE_URL=sqlite:///crm.db python -m benchmarks.explain
+"""
+from datetime import date
+
+
+def report_queries():
+    from app.reports.routes import booking_scope_query, outstanding_query, payments_scope_query
+    from app.models import Booking, Payment
+    from sqlalchemy import func
+
+    d1, d2 = date(2026, 1, 1), date(2026, 1, 31)
+    return [
+        ("compute_kpis_live bookings (agent, range)",
+         booking_scope_query(7, d1, d2).with_entities(func.count(Booking.id), func.sum(Booking.total_price))),
+        ("compute_kpis_live payments (agent, range)",
+         payments_scope_query(7, d1, d2).with_entities(func.sum(Payment.amount))),
+        ("compute_kpis_live bookings (all agents, range)",
+         booking_scope_query(None, d1, d2).with_entities(func.count(Booking.id))),
+        ("compute_kpis_live payments (all agents, range)",
+         payments_scope_query(None, d1, d2).with_entities(func.sum(Payment.amount))),
+        ("outstanding page (agent, range)",
+         outstanding_query(7, d1, d2, "", "").order_by(Booking.created_at.desc(), Booking.id.desc()).limit(26)),
+        ("booking detail payments",
+         Payment.query.filter_by(booking_id=1, is_archived=False).order_by(Payment.paid_at.desc())),
+    ]
+
+
+def main():
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app()
+    with app.app_context():
+        dialect = db.engine.dialect
+        prefix = "EXPLAIN QUERY PLAN " if dialect.name == "sqlite" else "EXPLAIN "
+        for label, q in report_queries():
+            sql = str(q.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            print(f"-- {label}")
+            for row in db.session.execute(db.text(prefix + sql)):
+                print("   ", row[-1])
+            print()
+
+
+if __name__ == "__main__":
+    main()
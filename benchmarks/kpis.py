@@ -0,0 +1,174 @@
+"""
+compute_kpis benchmark: query count + latency for
+- legacy: 4 queries, func.date() filters
+- live:   single-pass aggregates with half-open datetime ranges
+- rollup: daily_agent_stats (what the reports use)
+
+    python -m benchmarks.kpis --bookings 1000000
+
+Seeds a throwaway SQLite database (default: <tmp>/nomad_bench_kpis.db); the
+seed is reused on later runs unless --reseed is given.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+AGENTS = 20
+CHUNK = 50_000
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "nomad_bench_kpis.db"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reseed", action="store_true")
+    return parser.parse_args()
+
+
+def seed(db, n_bookings):
+    from sqlalchemy import insert
+    from app.models import Booking, Client, Payment, User
+
+    rnd = random.Random(42)
+    start = datetime(2024, 1, 1)
+    span = 2 * 365 * 24 * 3600
+
+    db.session.execute(insert(User), [
+        {"id": i, "full_name": f"Agent {i}", "email": f"agent{i}@bench.local", "password_hash": "-", "role": "agent"}
+        for i in range(1, AGENTS + 1)
+    ])
+    n_clients = max(1, n_bookings // 10)
+    db.session.execute(insert(Client), [
+        {"id": i, "agent_id": 1 + i % AGENTS, "first_name": "C", "last_name": str(i),
+         "email": f"c{i}@bench.local", "phone": str(i), "is_archived": False}
+        for i in range(1, n_clients + 1)
+    ])
+
+    for lo in range(1, n_bookings + 1, CHUNK):
+        ids = range(lo, min(lo + CHUNK, n_bookings + 1))
+        bookings, payments = [], []
+        for i in ids:
+            created = start + timedelta(seconds=rnd.randrange(span))
+            price = float(rnd.randrange(100, 5000))
+            paid = float(rnd.randrange(0, int(price)))
+            agent = 1 + i % AGENTS
+            bookings.append({
+                "id": i, "reference": f"BENCH-{i:09d}", "agent_id": agent, "client_id": 1 + i % n_clients,
+                "destination": "Rome", "currency": "EUR", "total_price": price, "internal_cost": price * 0.8,
+                "paid_total": paid, "due_total": price - paid, "payments_count": 1,
+                "status": "confirmed", "is_archived": False, "created_at": created,
+            })
+            payments.append({
+                "id": i, "booking_id": i, "agent_id": agent, "currency": "EUR", "amount": paid,
+                "paid_at": created + timedelta(days=1), "is_archived": False,
+            })
+        db.session.execute(insert(Booking), bookings)
+        db.session.execute(insert(Payment), payments)
+        db.session.commit()
+        print(f"  seeded {ids[-1]:,} bookings", flush=True)
+
+
+def legacy_compute_kpis(agent_id, date_from, date_to):
+    """compute_kpis para single-pass (referencë për krahasim)."""
+    from sqlalchemy import func
+    from app.models import Booking, Payment
+
+    bq = Booking.query.filter(func.coalesce(Booking.is_archived, False) == False)  # noqa: E712
+    pq = Payment.query.filter(func.coalesce(Payment.is_archived, False) == False)  # noqa: E712
+    if agent_id is not None:
+        bq = bq.filter(Booking.agent_id == agent_id)
+        pq = pq.filter(Payment.agent_id == agent_id)
+    if date_from:
+        bq = bq.filter(func.date(Booking.created_at) >= date_from)
+        pq = pq.filter(func.date(Payment.paid_at) >= date_from)
+    if date_to:
+        bq = bq.filter(func.date(Booking.created_at) <= date_to)
+        pq = pq.filter(func.date(Payment.paid_at) <= date_to)
+
+    total = bq.with_entities(func.count(Booking.id)).scalar() or 0
+    revenue = bq.with_entities(func.coalesce(func.sum(Booking.total_price), 0.0)).scalar() or 0.0
+    cost = bq.with_entities(func.coalesce(func.sum(Booking.internal_cost), 0.0)).scalar() or 0.0
+    paid = pq.with_entities(func.coalesce(func.sum(Payment.amount), 0.0)).scalar() or 0.0
+    return {"total_bookings": int(total), "revenue": float(revenue), "internal_cost": float(cost), "paid": float(paid)}
+
+
+@contextmanager
+def count_queries(engine):
+    from sqlalchemy import event
+
+    counter = {"n": 0}
+
+    def before_cursor_execute(*_args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def measure(db, fn, kwargs, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.rollback()
+        with count_queries(db.engine) as counter:
+            t0 = time.perf_counter()
+            result = fn(**kwargs)
+            timings.append((time.perf_counter() - t0) * 1000)
+    return result, counter["n"], statistics.median(timings)
+
+
+def main():
+    args = parse_args()
+    if args.reseed and os.path.exists(args.db):
+        os.remove(args.db)
+    fresh = not os.path.exists(args.db)
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    from app import create_app
+    from app.extensions import db
+    from app.models import DailyAgentStats
+    from app.reports.routes import compute_kpis, compute_kpis_live
+    from app.utils.rollups import rebuild_rollups
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if fresh:
+            print(f"Seeding {args.bookings:,} bookings into {args.db} ...")
+            seed(db, args.bookings)
+        if not DailyAgentStats.query.first():
+            print("Building daily_agent_stats ...")
+            rebuild_rollups()
+            db.session.commit()
+
+        scenarios = [
+            ("all time, all agents", {"agent_id": None, "date_from": None, "date_to": None}),
+            ("all time, one agent", {"agent_id": 7, "date_from": None, "date_to": None}),
+            ("30 days, all agents", {"agent_id": None, "date_from": date(2025, 3, 1), "date_to": date(2025, 3, 30)}),
+            ("30 days, one agent", {"agent_id": 7, "date_from": date(2025, 3, 1), "date_to": date(2025, 3, 30)}),
+        ]
+
+        impls = [("legacy", legacy_compute_kpis), ("live", compute_kpis_live), ("rollup", compute_kpis)]
+        print(f"\n{'scenario':<24}" + "".join(f"{name + ' q':>10}{name + ' ms':>11}" for name, _ in impls))
+        for label, kwargs in scenarios:
+            line = f"{label:<24}"
+            baseline = None
+            for name, fn in impls:
+                result, queries, ms = measure(db, fn, kwargs, args.repeat)
+                baseline = baseline or result
+                for k in ("total_bookings", "revenue", "internal_cost", "paid"):
+                    assert abs(float(baseline[k]) - float(result[k])) < 0.01 * max(1.0, abs(float(baseline[k]))), (label, name, k)
+                line += f"{queries:>10}{ms:>11.1f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""money columns: Float -> BIGINT minor units (cents)
+
+Revision ID: 0c6e4a9d27f1
+Revises: f3b8d2a61c47
+Create Date: 2026-10-17 20:41:17.930462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c6e4a9d27f1'
+down_revision = 'f3b8d2a61c47'
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = {
+    'bookings': ('total_price', 'discount', 'service_fee', 'extras_total', 'internal_cost',
+                 'refund_amount', 'paid_total', 'due_total'),
+    'payments': ('amount',),
+    'daily_agent_stats': ('revenue', 'internal_cost', 'paid'),
+}
+
+
+def upgrade():
+    # 12.34 -> 1234 (ROUND para ndryshimit të tipit, që CAST të mos presë decimalet)
+    for table, columns in MONEY_COLUMNS.items():
+        op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = ROUND({c} * 100)" for c in columns))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column,
+                       existing_type=sa.Float(),
+                       type_=sa.BigInteger(),
+                       postgresql_using=f'{column}::bigint')
+
+
+def downgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column,
+                       existing_type=sa.BigInteger(),
+                       type_=sa.Float(),
+                       postgresql_using=f'{column}::double precision')
+        op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = {c} / 100.0" for c in columns))
@@ -0,0 +1,28 @@
+"""blobs.last_acquired_at (docs-gc grace period)
+
+Revision ID: 1a7c5e3b9d20
+Revises: 0c6e4a9d27f1
+Create Date: 2026-10-17 22:05:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a7c5e3b9d20'
+down_revision = '0c6e4a9d27f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_acquired_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE blobs SET last_acquired_at = created_at")
+
+
+def downgrade():
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.drop_column('last_acquired_at')
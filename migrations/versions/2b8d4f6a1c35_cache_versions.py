@@ -0,0 +1,28 @@
+"""cache_versions (cross-worker cache invalidation)
+
+Revision ID: 2b8d4f6a1c35
+Revises: 1a7c5e3b9d20
+Create Date: 2026-10-17 22:31:09.604517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b8d4f6a1c35'
+down_revision = '1a7c5e3b9d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_versions')
@@ -0,0 +1,58 @@
+"""daily agent stats rollup
+
+Revision ID: 3b91f0c7a2d4
+Revises: 75ae6e05063c
+Create Date: 2026-10-17 11:02:13.550917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b91f0c7a2d4'
+down_revision = '75ae6e05063c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_agent_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('bookings', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.Float(), server_default='0', nullable=False),
+    sa.Column('internal_cost', sa.Float(), server_default='0', nullable=False),
+    sa.Column('paid', sa.Float(), server_default='0', nullable=False),
+    sa.Column('payments', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['agent_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('day', 'agent_id', 'currency')
+    )
+    with op.batch_alter_table('daily_agent_stats', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_agent_stats_agent_day', ['agent_id', 'day'], unique=False)
+
+    # backfill (e njëjta logjikë si `flask rebuild-rollups`)
+    op.execute(
+        """
+        INSERT INTO daily_agent_stats (day, agent_id, currency, bookings, revenue, internal_cost, paid, payments)
+        SELECT day, agent_id, currency, SUM(bookings), SUM(revenue), SUM(internal_cost), SUM(paid), SUM(payments)
+        FROM (
+            SELECT date(created_at) AS day, agent_id, COALESCE(currency, 'EUR') AS currency,
+                   1 AS bookings, COALESCE(total_price, 0) AS revenue, COALESCE(internal_cost, 0) AS internal_cost,
+                   0 AS paid, 0 AS payments
+            FROM bookings WHERE COALESCE(is_archived, false) = false
+            UNION ALL
+            SELECT date(paid_at), agent_id, COALESCE(currency, 'EUR'), 0, 0, 0, amount, 1
+            FROM payments WHERE COALESCE(is_archived, false) = false
+        ) facts
+        GROUP BY day, agent_id, currency
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('daily_agent_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_agent_stats_agent_day')
+
+    op.drop_table('daily_agent_stats')
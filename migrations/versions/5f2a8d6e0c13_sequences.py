@@ -0,0 +1,29 @@
+"""sequences table for reference / receipt / invoice numbers
+
+Revision ID: 5f2a8d6e0c13
+Revises: e07d5b3c19a8
+Create Date: 2026-10-17 15:08:44.310552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2a8d6e0c13'
+down_revision = 'e07d5b3c19a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # rreshtat krijohen në përdorimin e parë, duke vazhduar nga max() ekzistues
+    op.create_table('sequences',
+    sa.Column('name', sa.String(length=40), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('sequences')
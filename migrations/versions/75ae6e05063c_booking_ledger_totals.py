@@ -0,0 +1,53 @@
+"""booking ledger totals
+
+Revision ID: 75ae6e05063c
+Revises: d66e6a49cd53
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '75ae6e05063c'
+down_revision = 'd66e6a49cd53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('paid_total', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('due_total', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('payments_count', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill nga payments ekzistuese
+    op.execute(
+        """
+        UPDATE bookings SET
+            paid_total = (
+                SELECT COALESCE(SUM(p.amount), 0) FROM payments p
+                WHERE p.booking_id = bookings.id AND COALESCE(p.is_archived, false) = false
+            ),
+            payments_count = (
+                SELECT COUNT(p.id) FROM payments p
+                WHERE p.booking_id = bookings.id AND COALESCE(p.is_archived, false) = false
+            )
+        """
+    )
+    op.execute(
+        """
+        UPDATE bookings SET due_total = CASE
+            WHEN COALESCE(total_price, 0) - paid_total > 0 THEN COALESCE(total_price, 0) - paid_total
+            ELSE 0
+        END
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_column('payments_count')
+        batch_op.drop_column('due_total')
+        batch_op.drop_column('paid_total')
@@ -0,0 +1,54 @@
+"""search index (sqlite fts5 / postgres pg_trgm)
+
+Revision ID: 9c4e2a81f6b0
+Revises: 3b91f0c7a2d4
+Create Date: 2026-10-17 13:40:51.204337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e2a81f6b0'
+down_revision = '3b91f0c7a2d4'
+branch_labels = None
+depends_on = None
+
+TRGM_INDEXES = [
+    ('ix_clients_first_name_trgm', 'clients', 'first_name'),
+    ('ix_clients_last_name_trgm', 'clients', 'last_name'),
+    ('ix_clients_email_trgm', 'clients', 'email'),
+    ('ix_clients_phone_trgm', 'clients', 'phone'),
+    ('ix_bookings_reference_trgm', 'bookings', 'reference'),
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE clients_fts USING fts5(first_name, last_name, email, phone, tokenize='trigram')")
+        op.execute("CREATE VIRTUAL TABLE bookings_fts USING fts5(reference, tokenize='trigram')")
+        op.execute(
+            "INSERT INTO clients_fts (rowid, first_name, last_name, email, phone) "
+            "SELECT id, first_name, last_name, email, phone FROM clients"
+        )
+        op.execute("INSERT INTO bookings_fts (rowid, reference) SELECT id, reference FROM bookings")
+
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, table, column in TRGM_INDEXES:
+            op.create_index(name, table, [sa.text(f'{column} gin_trgm_ops')], postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS bookings_fts')
+        op.execute('DROP TABLE IF EXISTS clients_fts')
+
+    elif dialect == 'postgresql':
+        for name, table, _column in TRGM_INDEXES:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,54 @@
+"""is_archived NOT NULL + composite indexes for agent-scoped queries
+
+Revision ID: a4d8e1f7b2c6
+Revises: 5f2a8d6e0c13
+Create Date: 2026-10-17 16:02:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8e1f7b2c6'
+down_revision = '5f2a8d6e0c13'
+branch_labels = None
+depends_on = None
+
+ARCHIVABLE = ('clients', 'bookings', 'payments')
+
+
+def upgrade():
+    # NULL -> false, që filtrat të jenë thjesht "is_archived = false" (indeksueshme)
+    for table in ARCHIVABLE:
+        op.execute(sa.text(f"UPDATE {table} SET is_archived = :f WHERE is_archived IS NULL").bindparams(f=False))
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('is_archived',
+                   existing_type=sa.Boolean(),
+                   nullable=False,
+                   server_default=sa.false())
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_bookings_agent_archived_created', ['agent_id', 'is_archived', 'created_at'], unique=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_agent_paid_at', ['agent_id', 'paid_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payments_booking_id'), ['booking_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_payments_paid_at'), ['paid_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_payments_paid_at'))
+        batch_op.drop_index(batch_op.f('ix_payments_booking_id'))
+        batch_op.drop_index('ix_payments_agent_paid_at')
+
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_agent_archived_created')
+
+    for table in reversed(ARCHIVABLE):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('is_archived',
+                   existing_type=sa.Boolean(),
+                   nullable=True,
+                   server_default=None)
@@ -0,0 +1,42 @@
+"""blobs table + documents.sha256 / size_bytes (content-addressed storage)
+
+Revision ID: b7e3c9d41a05
+Revises: a4d8e1f7b2c6
+Create Date: 2026-10-17 17:21:13.604417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3c9d41a05'
+down_revision = 'a4d8e1f7b2c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    # dokumentet ekzistuese mbeten me file_path (sha256 NULL)
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_documents_sha256'), ['sha256'], unique=False)
+        batch_op.create_foreign_key('fk_documents_sha256_blobs', 'blobs', ['sha256'], ['sha256'])
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_documents_sha256_blobs', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_documents_sha256'))
+        batch_op.drop_column('size_bytes')
+        batch_op.drop_column('sha256')
+
+    op.drop_table('blobs')
@@ -0,0 +1,46 @@
+"""upload_sessions table (chunked / resumable document uploads)
+
+Revision ID: c2f6a8e5d917
+Revises: b7e3c9d41a05
+Create Date: 2026-10-17 18:04:52.117093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f6a8e5d917'
+down_revision = 'b7e3c9d41a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_sessions',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(length=50), nullable=False),
+    sa.Column('is_required', sa.Boolean(), nullable=False),
+    sa.Column('original_name', sa.String(length=255), nullable=False),
+    sa.Column('total_size', sa.BigInteger(), nullable=False),
+    sa.Column('received', sa.BigInteger(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('upload_sessions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_upload_sessions_booking_id'), ['booking_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_upload_sessions_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('upload_sessions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_upload_sessions_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_upload_sessions_booking_id'))
+
+    op.drop_table('upload_sessions')
@@ -0,0 +1,29 @@
+"""documents.preview_status (background thumbnails)
+
+Revision ID: d91b4f2c6e38
+Revises: c2f6a8e5d917
+Create Date: 2026-10-17 18:47:30.552861
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b4f2c6e38'
+down_revision = 'c2f6a8e5d917'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # dokumentet ekzistuese: NULL (pa preview); ato të reja imazh -> "pending"
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('preview_status', sa.String(length=20), nullable=True))
+        batch_op.create_index(batch_op.f('ix_documents_preview_status'), ['preview_status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_preview_status'))
+        batch_op.drop_column('preview_status')
@@ -0,0 +1,26 @@
+"""bookings (created_at, id) index for keyset pagination
+
+Revision ID: e07d5b3c19a8
+Revises: 9c4e2a81f6b0
+Create Date: 2026-10-17 14:25:09.771630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e07d5b3c19a8'
+down_revision = '9c4e2a81f6b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.create_index('ix_bookings_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('bookings', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookings_created_at_id')
@@ -0,0 +1,63 @@
+"""activity_logs booking_id / client_id + timeline indexes
+
+Revision ID: e5a7c3f90b12
+Revises: d91b4f2c6e38
+Create Date: 2026-10-17 19:26:08.104937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c3f90b12'
+down_revision = 'd91b4f2c6e38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('activity_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('booking_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('client_id', sa.Integer(), nullable=True))
+
+    # Backfill i lidhjeve për log-et ekzistuese (para indekseve, më shpejt)
+    op.execute(
+        "UPDATE activity_logs SET booking_id = entity_id "
+        "WHERE entity_type = 'Booking'"
+    )
+    op.execute(
+        "UPDATE activity_logs SET booking_id = "
+        "(SELECT payments.booking_id FROM payments WHERE payments.id = activity_logs.entity_id) "
+        "WHERE entity_type = 'Payment'"
+    )
+    op.execute(
+        "UPDATE activity_logs SET booking_id = "
+        "(SELECT documents.booking_id FROM documents WHERE documents.id = activity_logs.entity_id) "
+        "WHERE entity_type = 'Document'"
+    )
+    op.execute(
+        "UPDATE activity_logs SET client_id = entity_id "
+        "WHERE entity_type = 'Client'"
+    )
+    op.execute(
+        "UPDATE activity_logs SET client_id = "
+        "(SELECT bookings.client_id FROM bookings WHERE bookings.id = activity_logs.booking_id) "
+        "WHERE booking_id IS NOT NULL"
+    )
+
+    with op.batch_alter_table('activity_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_activity_logs_entity_created', ['entity_type', 'entity_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_activity_logs_booking_created', ['booking_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_activity_logs_client_created', ['client_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_activity_logs_user_created', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('activity_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_activity_logs_user_created')
+        batch_op.drop_index('ix_activity_logs_client_created')
+        batch_op.drop_index('ix_activity_logs_booking_created')
+        batch_op.drop_index('ix_activity_logs_entity_created')
+        batch_op.drop_column('client_id')
+        batch_op.drop_column('booking_id')
@@ -0,0 +1,29 @@
+"""fx_rates (daily exchange rates to BASE_CURRENCY)
+
+Revision ID: f3b8d2a61c47
+Revises: e5a7c3f90b12
+Create Date: 2026-10-17 20:04:51.276310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d2a61c47'
+down_revision = 'e5a7c3f90b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('fx_rates',
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('rate', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('currency', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('fx_rates')